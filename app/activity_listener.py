@@ -1,134 +1,168 @@
 """
 Activity listener for keyboard and mouse events.
 Tracks last activity time for idle detection.
-Provides system-level idle time when available (macOS/Windows) for ending force break.
+On macOS/Windows idle time comes straight from the OS (no input hooks); pynput listeners
+are only used as a fallback where no system idle API exists (Linux/X11).
 """
 import sys
-from datetime import datetime
-from typing import Optional
-from threading import Lock
-from pynput import keyboard, mouse
-from PySide6.QtCore import QObject, Signal
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Callable
+from PySide6.QtCore import QObject, Signal, QTimer
+from .config import CONFIG
+
+
+# Readings above this are treated as bogus (clock wrap / stale session data)
+_MAX_IDLE_MILLIS = 7 * 86400 * 1000
+
+
+def _load_system_idle_fn() -> Optional[Callable[[], Optional[float]]]:
+    """Resolve the OS idle-time call once at import. None if not available."""
+    if sys.platform == "darwin":
+        # macOS: CoreGraphics HID (mouse/keyboard) idle time
+        try:
+            from ctypes import cdll, c_uint32, c_int32, c_double
+            CG = cdll.LoadLibrary("/System/Library/Frameworks/CoreGraphics.framework/CoreGraphics")
+            # (CGEventSourceStateID, CGEventType): kCGEventSourceStateHIDSystemState = 1,
+            # kCGAnyInputEventType = ~0, which is -1 as the SDK's int32 CGEventType
+            seconds_since = CG.CGEventSourceSecondsSinceLastEventType
+            seconds_since.argtypes = [c_uint32, c_int32]
+            seconds_since.restype = c_double  # CFTimeInterval; a plain `float` restype is not a ctypes type
+            return lambda: seconds_since(1, -1)
+        except Exception:
+            return None
+    if sys.platform == "win32":
+        # Windows: GetLastInputInfo
+        try:
+            from ctypes import windll, Structure, c_uint, c_uint64, byref, sizeof
+            class LASTINPUTINFO(Structure):
+                _fields_ = [("cbSize", c_uint), ("dwTime", c_uint)]
+            get_last_input_info = windll.user32.GetLastInputInfo
+            # 64-bit tick count: GetTickCount wraps every 49.7 days
+            get_tick_count64 = windll.kernel32.GetTickCount64
+            get_tick_count64.restype = c_uint64
+            # One struct reused for every call; only dwTime is written by the OS
+            lii = LASTINPUTINFO()
+            lii.cbSize = sizeof(LASTINPUTINFO)
+            lii_ref = byref(lii)
+
+            def _idle() -> Optional[float]:
+                if get_last_input_info(lii_ref):
+                    # dwTime is the low 32 bits of the tick count: subtract modulo 2**32
+                    millis = (get_tick_count64() - lii.dwTime) & 0xFFFFFFFF
+                    if millis >= _MAX_IDLE_MILLIS:
+                        return None  # Implausible reading; don't spam idle reports
+                    return millis / 1000.0
+                return None
+            return _idle
+        except Exception:
+            return None
+    return None
+
+
+_system_idle_fn = _load_system_idle_fn()
 
 
 def _seconds_since_last_system_input() -> Optional[float]:
     """Seconds since last system-wide mouse/keyboard input. None if not available."""
+    if _system_idle_fn is None:
+        return None
     try:
-        if sys.platform == "darwin":
-            # macOS: CoreGraphics HID (mouse/keyboard) idle time
-            try:
-                from ctypes import cdll, c_uint32
-                CG = cdll.LoadLibrary("/System/Library/Frameworks/CoreGraphics.framework/CoreGraphics")
-                # kCGEventSourceStateHIDSystemState = 1, kCGAnyInputEventType = ~0 (any input)
-                CG.CGEventSourceSecondsSinceLastEventType.argtypes = [c_uint32, c_uint32]
-                CG.CGEventSourceSecondsSinceLastEventType.restype = float
-                return CG.CGEventSourceSecondsSinceLastEventType(1, 0xFFFFFFFF)
-            except Exception:
-                return None
-        if sys.platform == "win32":
-            # Windows: GetLastInputInfo
-            try:
-                from ctypes import windll, Structure, c_uint, byref
-                class LASTINPUTINFO(Structure):
-                    _fields_ = [("cbSize", c_uint), ("dwTime", c_uint)]
-                lii = LASTINPUTINFO()
-                lii.cbSize = 8
-                if windll.user32.GetLastInputInfo(byref(lii)):
-                    millis = windll.kernel32.GetTickCount() - lii.dwTime
-                    return millis / 1000.0
-            except Exception:
-                return None
+        seconds = _system_idle_fn()
     except Exception:
-        pass
-    return None
+        return None
+    # Reject nonsense readings (negative / NaN) so they can't trigger or reset idle thresholds
+    if seconds is not None and not (seconds >= 0):
+        if CONFIG.DEBUG:
+            print(f"[DEBUG] Ignoring invalid system idle reading: {seconds!r}")
+        return None
+    return seconds
 
 
 class ActivityListener(QObject):
-    """Listens for keyboard and mouse activity."""
-    
-    activity_detected = Signal()  # Emitted when any activity is detected
-    
+    """Tracks keyboard and mouse activity (system idle API, or pynput fallback)."""
+
+    activity_detected = Signal()  # Emitted (from a QTimer tick) when idle time drops, i.e. input happened
+
     def __init__(self):
         super().__init__()
-        self._last_activity_time: datetime = datetime.now()
-        self._lock = Lock()
-        self._keyboard_listener: Optional[keyboard.Listener] = None
-        self._mouse_listener: Optional[mouse.Listener] = None
+        self._last_activity_monotonic_ns: int = time.monotonic_ns()
+        self._keyboard_listener = None  # pynput keyboard.Listener (fallback only)
+        self._mouse_listener = None  # pynput mouse.Listener (fallback only)
         self._is_listening = False
-    
-    def _on_activity(self):
-        """Handle activity event."""
-        with self._lock:
-            self._last_activity_time = datetime.now()
-        self.activity_detected.emit()
-    
-    def _on_key_press(self, key):
-        """Handle key press."""
-        self._on_activity()
-    
-    def _on_mouse_move(self, x, y):
-        """Handle mouse move."""
-        self._on_activity()
-    
-    def _on_mouse_click(self, x, y, button, pressed):
-        """Handle mouse click."""
-        if pressed:
-            self._on_activity()
-    
-    def _on_mouse_scroll(self, x, y, dx, dy):
-        """Handle mouse scroll."""
-        self._on_activity()
-    
+        self._prev_idle_ns: Optional[int] = None
+        self._poll_timer = QTimer()
+        self._poll_timer.timeout.connect(self._poll_activity)
+
+    def _poll_activity(self):
+        """Emit activity_detected (at most once per tick, on the Qt thread) when idle time went down."""
+        idle_ns = self.get_ns_since_last_activity()
+        prev = self._prev_idle_ns
+        self._prev_idle_ns = idle_ns
+        if prev is not None and idle_ns < prev:
+            self.activity_detected.emit()
+
     def start(self):
         """Start listening for activity."""
         if self._is_listening:
             return
-        
+
         self._is_listening = True
-        
-        # Start keyboard listener
-        self._keyboard_listener = keyboard.Listener(on_press=self._on_key_press)
-        self._keyboard_listener.start()
-        
-        # Start mouse listener
-        self._mouse_listener = mouse.Listener(
-            on_move=self._on_mouse_move,
-            on_click=self._on_mouse_click,
-            on_scroll=self._on_mouse_scroll
-        )
-        self._mouse_listener.start()
-    
+        self._prev_idle_ns = None
+
+        # Only hook input events where the OS can't tell us the idle time
+        if _system_idle_fn is None:
+            # Imported here so macOS/Windows never load pynput (and its Quartz/Win32/Xlib backends)
+            from pynput import keyboard, mouse
+            # Callbacks run on pynput's threads for every event: keep them to one int store each
+            # (atomic under the GIL, no lock, no signal). activity_detected comes from the poll tick.
+            touch = lambda *_, _t=self, _now=time.monotonic_ns: setattr(_t, "_last_activity_monotonic_ns", _now())
+            self._keyboard_listener = keyboard.Listener(on_press=touch)
+            self._keyboard_listener.start()
+            self._mouse_listener = mouse.Listener(
+                on_move=touch,
+                on_click=lambda x, y, button, pressed: pressed and touch(),
+                on_scroll=touch
+            )
+            self._mouse_listener.start()
+
+        self._poll_timer.start(CONFIG.ACTIVITY_POLL_INTERVAL_MS)
+
     def stop(self):
         """Stop listening for activity."""
         if not self._is_listening:
             return
-        
+
         self._is_listening = False
-        
+        self._poll_timer.stop()
+
         if self._keyboard_listener:
             self._keyboard_listener.stop()
             self._keyboard_listener = None
-        
+
         if self._mouse_listener:
             self._mouse_listener.stop()
             self._mouse_listener = None
-    
+
     def get_last_activity_time(self) -> datetime:
-        """Get last activity time."""
-        with self._lock:
-            return self._last_activity_time
+        """Get last activity time as a wall-clock datetime (for display / API timestamps only)."""
+        return datetime.now() - timedelta(seconds=self.get_seconds_since_last_activity())
 
-    def get_seconds_since_last_activity(self) -> float:
-        """Seconds since last activity. Uses system idle time (macOS/Windows) when available, else our listener."""
-        now = datetime.now()
-        with self._lock:
-            app_seconds = (now - self._last_activity_time).total_seconds()
+    def get_ns_since_last_activity(self) -> int:
+        """Nanoseconds since last activity: system idle time (macOS/Windows) when available, else our listener.
+
+        Never more than the time since reset(), so a fresh start() gets a full grace period either way.
+        """
+        app_ns = time.monotonic_ns() - self._last_activity_monotonic_ns
         system_seconds = _seconds_since_last_system_input()
         if system_seconds is not None:
-            return min(app_seconds, system_seconds)
-        return app_seconds
-    
+            return min(int(system_seconds * 1_000_000_000), app_ns)
+        return app_ns
+
+    def get_seconds_since_last_activity(self) -> float:
+        """Seconds since last activity (see get_ns_since_last_activity)."""
+        return self.get_ns_since_last_activity() / 1_000_000_000
+
     def reset(self):
-        """Reset last activity time to now."""
-        with self._lock:
-            self._last_activity_time = datetime.now()
+        """Reset last activity time to now (also caps the system idle reading until the next real input)."""
+        self._last_activity_monotonic_ns = time.monotonic_ns()
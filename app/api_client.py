@@ -3,17 +3,70 @@ REST API client for attendance tracking application.
 Handles all API communication with the backend.
 """
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+import os
+import queue
+import re
+import threading
+import time
 from datetime import datetime
-from typing import Dict, Optional, Any
-from .config import API_BASE_URL
+from typing import Callable, Dict, Optional, Any, Tuple, Union
+from .config import API_BASE_URL, DEBUG
+
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> bytes:
+        """Serialize a request body straight to UTF-8 bytes (orjson)."""
+        return orjson.dumps(obj)
+except ImportError:  # orjson is optional; stdlib fallback
+    def _dumps(obj: Any) -> bytes:
+        """Serialize a request body to compact UTF-8 JSON bytes."""
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+# Per-request headers for JSON calls; the token lives on session.headers
+_JSON_HEADERS = {"Content-Type": "application/json"}
+# Multipart calls: requests sets Content-Type (with boundary) itself
+_MULTIPART_HEADERS: Dict[str, str] = {}
+
+
+# Screenshot uploads: (connect, read) seconds. Fail fast on a dead link instead of holding a
+# frame in memory across capture intervals; the next capture is sent instead.
+SCREENSHOT_UPLOAD_TIMEOUT = (3, 30)
+
+# Status GETs polled by the UI are served from cache for this long
+STATUS_CACHE_TTL_SECONDS = 2.0
+# POSTs that change check-in / break state (and so invalidate the status cache)
+_STATE_CHANGING_ENDPOINTS = frozenset({
+    "/auth/login", "/auth/logout", "/staff/check-in", "/staff/check-out",
+    "/staff/break/start", "/staff/break/end", "/desktop/break/force-start",
+})
+
+
+# Common FastAPI error body: exactly {"detail":"..."}
+_SIMPLE_DETAIL_RE = re.compile(rb'^\{"detail":"((?:[^"\\]|\\.)*)"\}$')
 
 
 def _extract_error_message(response, fallback_exc) -> str:
     """Extract user-friendly error message from API response JSON."""
+    try:
+        # Fast path: single-string detail, no full JSON parse
+        match = _SIMPLE_DETAIL_RE.match(response.content)
+        if match:
+            if DEBUG:
+                print(f"[DEBUG] Error Response: {response.content[:500]!r}")
+            raw = match.group(1)
+            detail = json.loads(b'"' + raw + b'"') if b"\\" in raw else raw.decode("utf-8")
+            if detail:
+                return detail
+    except Exception:
+        pass
     try:
         error_data = response.json()
-        print(f"[DEBUG] Error Response: {json.dumps(error_data, indent=2)}")
+        if DEBUG:
+            print(f"[DEBUG] Error Response: {json.dumps(error_data, indent=2)}")
         if isinstance(error_data, dict):
             detail = error_data.get("detail", error_data.get("message", error_data.get("error")))
             if isinstance(detail, str) and detail:
@@ -24,7 +77,8 @@ def _extract_error_message(response, fallback_exc) -> str:
             if detail is not None:
                 return str(detail)
     except Exception:
-        print(f"[DEBUG] Error Response (text): {response.text[:500]}")
+        if DEBUG:
+            print(f"[DEBUG] Error Response (text): {response.text[:500]}")
     return str(fallback_exc)
 
 
@@ -33,24 +87,76 @@ class APIClient:
     
     def __init__(self):
         self.base_url = API_BASE_URL
-        self.session_token: Optional[str] = None
+        self._urls: Dict[str, str] = {}  # endpoint -> full URL, built once per endpoint
         self.session = requests.Session()
+        # Small keep-alive pool (UI thread + background sender) so TLS is negotiated once and reused.
+        # Only GETs are retried (short backoff): a POST that timed out may already be committed
+        # (check-in, breaks, idle reports), and retries would also multiply the upload timeouts.
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4,
+                              max_retries=Retry(total=2, allowed_methods=frozenset({"GET"}), backoff_factor=0.3))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["Connection"] = "keep-alive"
+        # endpoint -> (ETag, parsed body) for conditional GETs; a 304 reuses the body
+        self._etag_cache: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self.session_token: Optional[str] = None
+        # endpoint -> (monotonic fetch time, response) for the status GETs; cleared by state-changing POSTs
+        self._status_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        # Bumped when a state-changing POST finishes: a GET that started earlier may hold the old state,
+        # so _get_cached doesn't store it
+        self._status_generation = 0
+        self._status_lock = threading.Lock()  # Makes "bump + clear" and "check + store" atomic
+        # Fire-and-forget sends (idle reports, screenshots) run on background workers so a
+        # network stall never blocks the Qt thread. One queue + thread per kind, so a slow
+        # screenshot upload never delays an idle report. Items: (seq, endpoint, on_done, _post kwargs).
+        self._send_queues: Dict[str, "queue.Queue[tuple]"] = {}
+        self._send_lock = threading.Lock()
+        self._send_seq = 0
+        self._latest_seq: Dict[str, int] = {}  # kind -> seq of newest coalescable item
+
+    @property
+    def session_token(self) -> Optional[str]:
+        """Bearer token sent with every request."""
+        return self._session_token
+
+    @session_token.setter
+    def session_token(self, token: Optional[str]):
+        """Set token and update the session's Authorization header once (not per request)."""
+        self._session_token = token
+        self._etag_cache.clear()  # Cached bodies belong to the previous user
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+        else:
+            self.session.headers.pop("Authorization", None)
     
     def _headers(self) -> Dict[str, str]:
-        """Get headers with session token if available."""
-        headers = {"Content-Type": "application/json"}
-        if self.session_token:
-            headers["Authorization"] = f"Bearer {self.session_token}"
-        return headers
+        """Per-request headers for JSON calls (Authorization is already on the session)."""
+        return _JSON_HEADERS
+
+    def _debug_headers(self, headers: Dict[str, str]) -> str:
+        """Merged session + request headers with the token masked, for [DEBUG] logs."""
+        merged = {**self.session.headers, **headers}
+        return json.dumps({k: v if k != 'Authorization' else 'Bearer ***' for k, v in merged.items()}, indent=2)
+    
+    def _url(self, endpoint: str) -> str:
+        """Full URL for endpoint (cached; endpoints are a small fixed set)."""
+        url = self._urls.get(endpoint)
+        if url is None:
+            url = self._urls[endpoint] = f"{self.base_url}{endpoint}"
+        return url
     
     def _get(self, endpoint: str) -> Dict[str, Any]:
-        """Make a GET request."""
-        url = f"{self.base_url}{endpoint}"
+        """Make a GET request. Conditional (If-None-Match) when the endpoint sent an ETag before."""
+        url = self._url(endpoint)
         headers = self._headers()
+        cached = self._etag_cache.get(endpoint)
+        if cached is not None:
+            headers = {**headers, "If-None-Match": cached[0]}
         
         # Debug logging
-        print(f"[DEBUG] GET {url}")
-        print(f"[DEBUG] Headers: {json.dumps({k: v if k != 'Authorization' else 'Bearer ***' for k, v in headers.items()}, indent=2)}")
+        if DEBUG:
+            print(f"[DEBUG] GET {url}")
+            print(f"[DEBUG] Headers: {self._debug_headers(headers)}")
         
         try:
             response = self.session.get(
@@ -59,36 +165,79 @@ class APIClient:
                 timeout=10
             )
             
-            print(f"[DEBUG] Response Status: {response.status_code}")
+            if DEBUG:
+                print(f"[DEBUG] Response Status: {response.status_code}")
             
+            if response.status_code == 304 and cached is not None:
+                return cached[1]  # Unchanged: no body to download or parse
             response.raise_for_status()
-            return response.json()
+            result = response.json()
+            etag = response.headers.get("ETag")
+            if etag:
+                self._etag_cache[endpoint] = (etag, result)
+            return result
         except requests.exceptions.HTTPError as e:
             raise Exception(_extract_error_message(response, e))
         except requests.exceptions.RequestException as e:
             raise Exception(str(e))
     
-    def _post(self, endpoint: str, data: Optional[Dict] = None, timeout: int = 10) -> Dict[str, Any]:
-        """Make a POST request."""
-        url = f"{self.base_url}{endpoint}"
-        headers = self._headers()
+    def _post(self, endpoint: str, data: Optional[Dict] = None, timeout: Union[float, Tuple[float, float]] = 10,
+              files: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Make a POST request. JSON body by default; multipart form (data + files) when files is given."""
+        if endpoint in _STATE_CHANGING_ENDPOINTS:
+            self._status_cache.clear()
+            try:
+                return self._send_post(endpoint, data, timeout, files)
+            finally:
+                with self._status_lock:
+                    self._status_generation += 1
+                    self._status_cache.clear()  # Drop anything cached while the POST was in flight
+        return self._send_post(endpoint, data, timeout, files)
+
+    def _send_post(self, endpoint: str, data: Optional[Dict], timeout: Union[float, Tuple[float, float]],
+                   files: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """POST without touching the status cache (see _post)."""
+        url = self._url(endpoint)
+        headers = _MULTIPART_HEADERS if files else self._headers()
         
-        # Debug logging (can be removed in production)
-        print(f"[DEBUG] POST {url}")
-        print(f"[DEBUG] Headers: {json.dumps({k: v if k != 'Authorization' else 'Bearer ***' for k, v in headers.items()}, indent=2)}")
-        if data:
-            print(f"[DEBUG] Body: {json.dumps(data, indent=2)}")
+        # Debug logging (TRACKER_DEBUG=1)
+        if DEBUG:
+            print(f"[DEBUG] POST {url}")
+            print(f"[DEBUG] Headers: {self._debug_headers(headers)}")
+            if data:
+                # Never dump large binary payloads (screenshots); log their size instead
+                logged = {k: (f"<{len(v)} chars>" if k == "screenshot_base64" else v) for k, v in data.items()}
+                print(f"[DEBUG] Body: {json.dumps(logged, indent=2)}")
+            if files:
+                print(f"[DEBUG] Files: {', '.join(f'{k} <{len(v[1])} bytes>' for k, v in files.items())}")
         
         try:
-            response = self.session.post(
-                url,
-                json=data,
-                headers=headers,
-                timeout=timeout
-            )
+            if files:
+                response = self.session.post(
+                    url,
+                    data=data,
+                    files=files,
+                    headers=headers,
+                    timeout=timeout
+                )
+            elif data is not None:
+                response = self.session.post(
+                    url,
+                    data=_dumps(data),
+                    headers=headers,
+                    timeout=timeout
+                )
+            else:
+                # No-body endpoints (check-in/out, breaks, logout): nothing to serialize
+                response = self.session.post(
+                    url,
+                    headers=headers,
+                    timeout=timeout
+                )
             
             # Debug response
-            print(f"[DEBUG] Response Status: {response.status_code}")
+            if DEBUG:
+                print(f"[DEBUG] Response Status: {response.status_code}")
             
             response.raise_for_status()
             return response.json()
@@ -98,6 +247,80 @@ class APIClient:
         except requests.exceptions.RequestException as e:
             raise Exception(f"API request failed: {str(e)}")
     
+    def _get_cached(self, endpoint: str) -> Dict[str, Any]:
+        """GET through the status cache (fresh for STATUS_CACHE_TTL_SECONDS)."""
+        now = time.monotonic()
+        cached = self._status_cache.get(endpoint)
+        if cached is not None and now - cached[0] < STATUS_CACHE_TTL_SECONDS:
+            return cached[1]
+        generation = self._status_generation
+        result = self._get(endpoint)
+        with self._status_lock:
+            if generation == self._status_generation:  # No check-in / break change landed during the GET
+                self._status_cache[endpoint] = (now, result)
+        return result
+
+    def _enqueue_post(self, kind: str, endpoint: str, coalesce: bool = False,
+                      on_done: Optional[Callable[[Optional[str]], None]] = None, **post_kwargs):
+        """Queue a POST (_post kwargs) for the kind's background worker. With coalesce, older queued items of the same kind are dropped.
+
+        on_done(error) is called on the worker thread once the item is settled: None when sent, else the
+        error message (also when it was dropped unsent).
+        """
+        with self._send_lock:
+            self._send_seq += 1
+            seq = self._send_seq
+            if coalesce:
+                self._latest_seq[kind] = seq
+            send_queue = self._send_queues.get(kind)
+            if send_queue is None:
+                send_queue = self._send_queues[kind] = queue.Queue()
+                threading.Thread(target=self._send_worker, args=(kind, send_queue),
+                                 name=f"api-send-{kind}", daemon=True).start()
+        send_queue.put((seq, endpoint, on_done, post_kwargs))
+
+    def _send_worker(self, kind: str, send_queue: "queue.Queue[tuple]"):
+        """Drain one kind's send queue forever (daemon thread)."""
+        while True:
+            seq, endpoint, on_done, post_kwargs = send_queue.get()
+            error = None
+            try:
+                latest = self._latest_seq.get(kind)
+                if latest is not None and seq < latest:
+                    error = "dropped"  # A newer report of the same kind is queued, or drop_queued
+                else:
+                    self._post(endpoint, **post_kwargs)
+            except Exception as e:
+                error = str(e) or type(e).__name__
+                print(f"Background {kind} request failed: {e}")
+            finally:
+                send_queue.task_done()
+            if on_done is not None:
+                try:
+                    on_done(error)
+                except Exception as e:
+                    print(f"Background {kind} callback failed: {e}")
+
+    def drop_queued(self, kind: str):
+        """Discard sends of kind that are still queued (the one in progress, if any, completes)."""
+        with self._send_lock:
+            # Every queued item of this kind now has seq < latest, so the worker skips it
+            self._latest_seq[kind] = self._send_seq + 1
+
+    def _clear_send_queue(self):
+        """Drop queued background sends (e.g. on logout, when the token is gone)."""
+        with self._send_lock:
+            send_queues = list(self._send_queues.values())
+        for send_queue in send_queues:
+            while True:
+                try:
+                    _, _, on_done, _ = send_queue.get_nowait()
+                except queue.Empty:
+                    break
+                send_queue.task_done()
+                if on_done is not None:
+                    on_done("dropped")
+
     def login(self, email: str, password: str) -> Dict[str, Any]:
         """
         POST /auth/login
@@ -152,18 +375,22 @@ class APIClient:
         """
         return self._post("/desktop/break/force-start")
     
-    def report_idle(self, idle_seconds: int) -> Dict[str, Any]:
+    def report_idle(self, idle_seconds: int,
+                    on_done: Optional[Callable[[Optional[str]], None]] = None) -> Dict[str, Any]:
         """
         POST /desktop/idle/report
         Body: {idle_seconds: int (duration in seconds), timestamp: str (ISO format)}
         Company rules idle1_time / idle2_time / idle3_time are in minutes; this API expects seconds.
+        Sent in the background, every report in order (each threshold is its own event);
+        on_done(error) reports the outcome from the sender thread (error is None when sent).
         """
         timestamp = datetime.utcnow().isoformat() + "Z"
         data = {
             "idle_seconds": int(idle_seconds),  # always in seconds (e.g. 1800 = 30 min)
             "timestamp": timestamp
         }
-        return self._post("/desktop/idle/report", data)
+        self._enqueue_post("idle", "/desktop/idle/report", on_done=on_done, data=data)
+        return {"status": "queued"}
 
     def report_usage(self, entries: list) -> Dict[str, Any]:
         """
@@ -173,12 +400,14 @@ class APIClient:
         data = {"entries": entries}
         return self._post("/desktop/usage/report", data)
     
-    def upload_screenshot(self, screenshot_base64: str) -> Dict[str, Any]:
+    def upload_screenshot(self, screenshot_base64: str,
+                          on_done: Optional[Callable[[Optional[str]], None]] = None) -> Dict[str, Any]:
         """
         POST /desktop/screenshot/upload
         Body: {screenshot_base64: str, timestamp: str (ISO format)}
-        Returns: {status, ...}
-        Uses longer timeout (60s) for large payload.
+        Sent in the background; returns immediately. A newer screenshot replaces one still queued.
+        on_done(error) reports the outcome from the sender thread (error is None when delivered).
+        Short connect / read timeout (SCREENSHOT_UPLOAD_TIMEOUT) so a stalled upload is dropped.
         """
         timestamp = datetime.utcnow().isoformat() + "Z"
         data = {
@@ -186,7 +415,29 @@ class APIClient:
             "screen_status": "active",
             "timestamp": timestamp
         }
-        return self._post("/desktop/screenshot/upload", data, timeout=60)
+        self._enqueue_post("screenshot", "/desktop/screenshot/upload", coalesce=True, on_done=on_done, data=data,
+                           timeout=SCREENSHOT_UPLOAD_TIMEOUT)
+        return {"status": "queued"}
+
+    def upload_screenshot_bytes(self, image_bytes: bytes, content_type: str = "image/jpeg",
+                                on_done: Optional[Callable[[Optional[str]], None]] = None) -> Dict[str, Any]:
+        """
+        POST /desktop/screenshot/upload (multipart/form-data)
+        Form: screenshot=<file>, screen_status, timestamp (ISO format)
+        Raw image bytes instead of base64-in-JSON: ~25% smaller body, no encode pass.
+        Sent in the background; returns immediately. A newer screenshot replaces one still queued.
+        on_done(error) reports the outcome from the sender thread (error is None when delivered).
+        """
+        timestamp = datetime.utcnow().isoformat() + "Z"
+        ext = "png" if content_type == "image/png" else "jpg"
+        data = {
+            "screen_status": "active",
+            "timestamp": timestamp
+        }
+        files = {"screenshot": (f"screenshot.{ext}", image_bytes, content_type)}
+        self._enqueue_post("screenshot", "/desktop/screenshot/upload", coalesce=True, on_done=on_done,
+                           data=data, files=files, timeout=SCREENSHOT_UPLOAD_TIMEOUT)
+        return {"status": "queued"}
     
     def logout(self) -> Dict[str, Any]:
         """
@@ -194,6 +445,7 @@ class APIClient:
         Logout and invalidate session
         Returns: {status, ...}
         """
+        self._clear_send_queue()
         try:
             result = self._post("/auth/logout")
             self.session_token = None
@@ -203,6 +455,47 @@ class APIClient:
             self.session_token = None
             return {}
     
+    def save_etag_cache(self, path: str, owner: str):
+        """Write the conditional-GET cache to disk (owner-only file) so a restart can revalidate with a 304."""
+        if not self._etag_cache:
+            return
+        payload = {
+            "owner": owner,
+            "saved_at": time.time(),
+            "entries": {endpoint: [etag, body] for endpoint, (etag, body) in self._etag_cache.items()},
+        }
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with os.fdopen(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb") as f:
+                f.write(_dumps(payload))
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Failed to save dashboard cache: {e}")
+
+    def load_etag_cache(self, path: str, owner: str, max_age_seconds: float):
+        """Load a cache written by save_etag_cache, if it belongs to owner and is younger than max_age_seconds."""
+        try:
+            with open(path, "rb") as f:
+                payload = json.loads(f.read())
+            if payload.get("owner") != owner:
+                return
+            if not 0 <= time.time() - float(payload.get("saved_at", 0)) < max_age_seconds:
+                return
+            for endpoint, (etag, body) in payload.get("entries", {}).items():
+                self._etag_cache.setdefault(endpoint, (etag, body))
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"Ignoring dashboard cache: {e}")
+
+    def close(self):
+        """Drop queued sends and close pooled keep-alive connections (the session reconnects on next use)."""
+        self._clear_send_queue()
+        self._status_cache.clear()
+        self._etag_cache.clear()
+        self.session.close()
+
     def get_current_user(self) -> Dict[str, Any]:
         """
         GET /auth/me
@@ -217,7 +510,7 @@ class APIClient:
         Returns: staff, today_attendance, today_sessions, is_checked_in, is_checked_out,
                  on_break, current_break, stats, etc.
         """
-        return self._get("/staff/dashboard/stats")
+        return self._get_cached("/staff/dashboard/stats")
 
     def get_attendance_status(self) -> Dict[str, Any]:
         """
@@ -225,4 +518,16 @@ class APIClient:
         Get current attendance status including check-in time, break status, work duration
         Returns: {status, check_in_time, break_status, ...}
         """
-        return self._get("/desktop/attendance/status")
+        return self._get_cached("/desktop/attendance/status")
+
+    def get_status_bundle(self) -> Dict[str, Any]:
+        """
+        Dashboard stats + attendance status in one call.
+        Each part is fetched only if it isn't already cached, so refreshing both costs at most
+        one round-trip each per STATUS_CACHE_TTL_SECONDS.
+        Returns: {dashboard_stats: {...}, attendance_status: {...}}
+        """
+        return {
+            "dashboard_stats": self.get_dashboard_stats(),
+            "attendance_status": self.get_attendance_status(),
+        }
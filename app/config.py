@@ -2,17 +2,49 @@
 Configuration settings for the attendance tracking application.
 """
 import os
+from dataclasses import dataclass
 
-# API Configuration
-# API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000/api")
-API_BASE_URL = os.getenv("API_BASE_URL", "https://trackly.net/api")
 
-# Application Settings
-APP_NAME = "Attendance Tracker"
-APP_VERSION = "1.0.0"
+@dataclass(frozen=True, slots=True)
+class Config:
+    """Runtime settings (read once at import; immutable afterwards)."""
+    # API Configuration
+    # API_BASE_URL: str = os.getenv("API_BASE_URL", "http://localhost:8000/api")
+    API_BASE_URL: str = os.getenv("API_BASE_URL", "https://trackly.net/api")
 
-# Idle Tracking Settings
-IDLE_CHECK_INTERVAL_SECONDS = 5  # How often to check for idle time
+    # Application Settings
+    APP_NAME: str = "Attendance Tracker"
+    APP_VERSION: str = "1.0.0"
+    DEBUG: bool = os.getenv("TRACKER_DEBUG") == "1"  # Verbose [DEBUG] request/response logging
+
+    # Idle Tracking Settings
+    IDLE_CHECK_INTERVAL_SECONDS: int = 5  # How often to check for idle time
+    ACTIVITY_POLL_INTERVAL_MS: int = 1000  # How often ActivityListener polls idle time to detect new input
+
+    # Screenshot upload: "multipart" (raw JPEG file) or "base64" (legacy JSON body)
+    SCREENSHOT_UPLOAD_MODE: str = os.getenv("SCREENSHOT_UPLOAD_MODE", "multipart")
+
+    # On-disk ETag cache for /staff/dashboard/stats (first poll after a restart can be a 304)
+    DASHBOARD_CACHE_FILE: str = os.path.join(os.path.expanduser("~"), ".config", "tracker_app", "dashboard_cache.json")
+    DASHBOARD_CACHE_TTL_SECONDS: int = 600  # Older saved entries are ignored
+
+    # SQLite (WAL) store of usage seconds not yet accepted by /desktop/usage/report
+    USAGE_DB_FILE: str = os.path.join(os.path.expanduser("~"), ".config", "tracker_app", "usage.db")
+
+
+CONFIG = Config()
+
+# Module-level aliases for `from .config import X`
+API_BASE_URL = CONFIG.API_BASE_URL
+APP_NAME = CONFIG.APP_NAME
+APP_VERSION = CONFIG.APP_VERSION
+DEBUG = CONFIG.DEBUG
+IDLE_CHECK_INTERVAL_SECONDS = CONFIG.IDLE_CHECK_INTERVAL_SECONDS
+ACTIVITY_POLL_INTERVAL_MS = CONFIG.ACTIVITY_POLL_INTERVAL_MS
+SCREENSHOT_UPLOAD_MODE = CONFIG.SCREENSHOT_UPLOAD_MODE
+DASHBOARD_CACHE_FILE = CONFIG.DASHBOARD_CACHE_FILE
+DASHBOARD_CACHE_TTL_SECONDS = CONFIG.DASHBOARD_CACHE_TTL_SECONDS
+USAGE_DB_FILE = CONFIG.USAGE_DB_FILE
 
 # UI Settings
 WINDOW_WIDTH = 400
@@ -2,19 +2,22 @@
 Idle time tracker service.
 Reports to API only when idle crosses company_rules thresholds: idle1_time, idle2_time, idle3_time (minutes).
 """
-from datetime import datetime
+import bisect
 from typing import List
-from PySide6.QtCore import QObject, Signal, QTimer
+from PySide6.QtCore import Qt, QObject, Signal, QTimer
 from .activity_listener import ActivityListener
 from .state_manager import StateManager, AppState
 from .api_client import APIClient
-from .config import IDLE_CHECK_INTERVAL_SECONDS
+from .config import CONFIG
+
+IDLE_CHECK_INTERVAL_NS = CONFIG.IDLE_CHECK_INTERVAL_SECONDS * 1_000_000_000
 
 
 class IdleTracker(QObject):
     """Tracks idle time; reports to API only when crossing idle1 / idle2 / idle3 thresholds (in order)."""
     
     idle_updated = Signal(int)  # Emitted with idle_seconds
+    _report_settled = Signal(int, str)  # threshold index, error ("" = sent); emitted from the API sender thread
     
     def __init__(self, state_manager: StateManager, api_client: APIClient,
                  activity_listener: ActivityListener):
@@ -23,11 +26,16 @@ class IdleTracker(QObject):
         self.api_client = api_client
         self.activity_listener = activity_listener
         
+        # Single-shot: re-armed for exactly the time left until the next threshold
         self._timer = QTimer()
+        self._timer.setSingleShot(True)
         self._timer.timeout.connect(self._check_idle)
+        self.activity_listener.activity_detected.connect(self._on_activity)
         self._is_active = False
         # Index of last threshold we reported (-1 = none, 0 = idle1, 1 = idle2, 2 = idle3)
         self._last_reported_threshold_index = -1
+        self._pending_threshold_index = -1  # Threshold whose report is queued but not yet confirmed sent
+        self._report_settled.connect(self._on_report_settled, Qt.QueuedConnection)
     
     def start(self):
         """Start idle tracking."""
@@ -36,7 +44,8 @@ class IdleTracker(QObject):
         self._is_active = True
         self.activity_listener.reset()
         self._last_reported_threshold_index = -1
-        self._timer.start(IDLE_CHECK_INTERVAL_SECONDS * 1000)
+        self._pending_threshold_index = -1
+        self._schedule(IDLE_CHECK_INTERVAL_NS)
     
     def stop(self):
         """Stop idle tracking."""
@@ -45,32 +54,61 @@ class IdleTracker(QObject):
         self._is_active = False
         self._timer.stop()
     
+    def _on_activity(self):
+        """User is back after a reported threshold: re-check now so the next idle spell reports again."""
+        if self._is_active and max(self._last_reported_threshold_index, self._pending_threshold_index) >= 0:
+            self._check_idle()
+
+    def _schedule(self, delay_ns: int):
+        """Arm the single-shot timer (at least 500 ms out)."""
+        self._timer.start(max(500, delay_ns // 1_000_000))
+
     def _check_idle(self):
         """Check idle time; report to API only when crossing next threshold (idle1 → idle2 → idle3)."""
         if self.state_manager.state != AppState.CHECKED_IN:
+            self.stop()
             return
         
-        last_activity = self.activity_listener.get_last_activity_time()
-        now = datetime.now()
-        idle_seconds = int((now - last_activity).total_seconds())
-        thresholds: List[int] = self.state_manager.idle_report_thresholds_seconds  # [idle1_sec, idle2_sec, idle3_sec]
+        idle_ns = self.activity_listener.get_ns_since_last_activity()
+        idle_seconds = idle_ns // 1_000_000_000
+        thresholds_ns: List[int] = self.state_manager.idle_report_thresholds_ns  # [idle1, idle2, idle3] in ns, sorted
         
         self.idle_updated.emit(idle_seconds)
         
-        if not thresholds:
+        if not thresholds_ns:
+            self._schedule(IDLE_CHECK_INTERVAL_NS)
             return
         
+        # Index of the highest threshold idle time has reached (-1 = below idle1)
+        crossed = bisect.bisect_right(thresholds_ns, idle_ns) - 1
+        
         # User became active again: below first threshold → reset so we report again when they go idle
-        if idle_seconds < thresholds[0]:
+        if crossed < 0:
             self._last_reported_threshold_index = -1
+            self._pending_threshold_index = -1  # A late confirmation must not mark this new idle spell reported
+            self._schedule(thresholds_ns[0] - idle_ns)
             return
         
-        # Report when crossing the next threshold we haven't reported yet (in order)
-        for i in range(len(thresholds)):
-            if idle_seconds >= thresholds[i] and self._last_reported_threshold_index < i:
-                try:
-                    self.api_client.report_idle(idle_seconds)
-                    self._last_reported_threshold_index = i
-                except Exception as e:
-                    print(f"Failed to report idle time: {e}")
-                return
+        # One report for the highest newly-crossed threshold (skipped ones, e.g. after sleep, aren't replayed).
+        # The index only advances once the sender confirms the POST (_on_report_settled).
+        if crossed > max(self._last_reported_threshold_index, self._pending_threshold_index):
+            self._pending_threshold_index = crossed
+            self.api_client.report_idle(
+                idle_seconds, on_done=lambda error, index=crossed: self._report_settled.emit(index, error or ""))
+        
+        # Sleep until the next unreported threshold; after the last one, wait for activity (_on_activity)
+        next_index = max(self._last_reported_threshold_index, self._pending_threshold_index) + 1
+        if next_index < len(thresholds_ns):
+            self._schedule(thresholds_ns[next_index] - idle_ns)
+
+    def _on_report_settled(self, index: int, error: str):
+        """Sender finished an idle report (GUI thread): mark the threshold reported, or retry soon."""
+        if index != self._pending_threshold_index:
+            return  # Superseded (user came back, tracking restarted, or a higher threshold is pending)
+        self._pending_threshold_index = -1
+        if not error:
+            self._last_reported_threshold_index = max(self._last_reported_threshold_index, index)
+            return
+        print(f"Failed to report idle time: {error}")
+        if self._is_active:
+            self._schedule(IDLE_CHECK_INTERVAL_NS)  # Retry soon
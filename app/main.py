@@ -7,14 +7,33 @@ On internet disconnect, background API calls (idle report, screenshot, force bre
 poll) fail safely and are retried on the next timer tick. When internet reconnects, the next
 scheduled call succeeds; no special reconnect logic required.
 """
+import hashlib
+import json
 import sys
+import time
 from datetime import datetime
-from typing import Optional
+from functools import lru_cache, partial
+from typing import Any, Callable, Dict, Optional
 from PySide6.QtWidgets import QApplication, QStackedWidget, QMessageBox
-from PySide6.QtCore import QTimer, Qt, QEvent
+from PySide6.QtCore import QTimer, Qt, QEvent, Signal, QObject, QRunnable, QThreadPool
 from PySide6.QtGui import QCloseEvent
 
 from .api_client import APIClient
+from .config import DASHBOARD_CACHE_FILE, DASHBOARD_CACHE_TTL_SECONDS
+from .state_manager import StateManager, AppState
+from .activity_listener import ActivityListener
+from .idle_tracker import IdleTracker
+from .screenshot_service import ScreenshotService
+from .usage_tracker import UsageTracker
+from .ui.login_window import LoginWindow
+from .ui.dashboard_window import DashboardWindow
+
+# Dashboard poll: faster while checked in; slower otherwise
+POLL_CHECKED_IN_MS = 15_000
+POLL_BACKGROUND_MS = 30_000  # On break, checked out, or window minimized
+FORCE_BREAK_CHECK_MS = 1000  # Local idle check for force break (no network)
+FORCE_BREAK_RETRY_SECONDS = 5  # Pause after a failed force-break POST before trying again
+LOGOUT_REPORT_WAIT_MS = 5000  # Max wait for the final usage flush before the logout POST
 
 
 def _to_local_naive(dt: datetime):
@@ -24,24 +43,56 @@ def _to_local_naive(dt: datetime):
     if getattr(dt, "tzinfo", None) is not None:
         return dt.astimezone().replace(tzinfo=None)
     return dt
-from .state_manager import StateManager, AppState
-from .activity_listener import ActivityListener
-from .idle_tracker import IdleTracker
-from .screenshot_service import ScreenshotService
-from .usage_tracker import UsageTracker
-from .ui.login_window import LoginWindow
-from .ui.dashboard_window import DashboardWindow
+
+
+@lru_cache(maxsize=128)
+def _iso_to_local_naive(iso: str) -> datetime:
+    """Parse an API ISO timestamp ('Z' allowed) to local naive (cached: the same strings come back every poll)."""
+    return _to_local_naive(datetime.fromisoformat(iso.replace("Z", "+00:00")))
 
 
 class MinimizableStackedWidget(QStackedWidget):
     """Stacked widget that minimizes instead of closing."""
     
+    minimized_changed = Signal(bool)  # True when minimized, False when restored
+    
+    def changeEvent(self, event: QEvent):
+        """Report minimize / restore so background polling can slow down."""
+        if event.type() == QEvent.WindowStateChange:
+            self.minimized_changed.emit(self.isMinimized())
+        super().changeEvent(event)
+    
     def closeEvent(self, event: QCloseEvent):
         """Override close event to minimize instead of exit."""
         event.ignore()
         self.showMinimized()
 
 
+class _ApiCallSignals(QObject):
+    """Signals for _ApiCallWorker (QRunnable is not a QObject); delivered queued on the GUI thread."""
+
+    result = Signal(object)
+    error = Signal(str)
+
+
+class _ApiCallWorker(QRunnable):
+    """Runs one blocking API call on a QThreadPool thread."""
+
+    def __init__(self, fn: Callable[[], Any]):
+        super().__init__()
+        self.fn = fn
+        self.signals = _ApiCallSignals()
+
+    def run(self):
+        """Call fn; emit result or error (str)."""
+        try:
+            result = self.fn()
+        except Exception as e:
+            self.signals.error.emit(str(e))
+            return
+        self.signals.result.emit(result)
+
+
 class AttendanceApp:
     """Main application class."""
     
@@ -73,19 +124,38 @@ class AttendanceApp:
         self.stacked_widget.addWidget(self.dashboard_window)
         self.stacked_widget.setCurrentWidget(self.login_window)
         
-        # Force break: enter (idle for N min) and exit (only on real mouse/keyboard via activity_detected signal)
+        # Force break: enter (idle for N min; local check every second while checked in, no network)
+        # and exit (only on real mouse/keyboard via activity_detected signal)
         self._force_break_timer = QTimer()
         self._force_break_timer.timeout.connect(self._check_force_break)
-        self._force_break_timer.start(5000)  # Every 5s: dashboard sync + maybe enter force break
+        self._force_break_retry_at = 0.0  # time.monotonic() before which a failed force break isn't retried
+        # Dashboard sync: started on login; interval follows state / window (see _update_poll_timer)
+        self._dashboard_poll_timer = QTimer()
+        self._dashboard_poll_timer.timeout.connect(self._poll_dashboard)
+        self._window_minimized = False
         
         self._keep_alive_timer = QTimer()
         self._keep_alive_timer.timeout.connect(self._send_keep_alive)
+        # (digest of last applied /staff/dashboard/stats, state after applying it)
+        self._last_dashboard_sync: Optional[tuple] = None
+        # Dashboard setter key -> args it was last called with (see _apply_if_changed)
+        self._last_applied: Dict[str, tuple] = {}
+        self._cache_owner: Optional[str] = None  # Login email; keys the on-disk dashboard cache
+        # Login / logout run on their own single-thread pool so a new login never overtakes the
+        # previous logout (which clears the token); everything else uses the global pool
+        self._session_pool = QThreadPool()
+        self._session_pool.setMaxThreadCount(1)
+        # Bumped by every local state change that a dashboard poll started earlier could undo
+        # (actions, force break, logout): such poll results are dropped
+        self._sync_epoch = 0
+        self._poll_inflight = False
+        self._force_break_inflight = False
         
         # Wire up signals
         self._connect_signals()
         
-        # Start activity listener
-        self.activity_listener.start()
+        self.app.aboutToQuit.connect(self._save_dashboard_cache)
+        # Activity listener polls only while checked in / on force break (see _on_state_changed)
     
     def _connect_signals(self):
         """Connect all signals and slots."""
@@ -99,23 +169,39 @@ class AttendanceApp:
         self.dashboard_window.start_break_requested.connect(self._handle_start_break)
         self.dashboard_window.end_break_requested.connect(self._handle_end_break)
         
+        # Window minimize / restore (adaptive polling)
+        self.stacked_widget.minimized_changed.connect(self._on_minimized_changed)
+        
         # State manager
-        self.state_manager.state_changed.connect(self._on_state_changed)
-        self.state_manager.user_data_changed.connect(self._on_user_data_changed)
+        # (plain observers: same thread, no Qt signal dispatch per state write)
+        self.state_manager.on_state_change(self._on_state_changed)
+        self.state_manager.on_data_change(self._on_user_data_changed)
         
-        # Activity listener (for resuming from force break). QueuedConnection so slot runs in main thread
-        # when signal is emitted from pynput's listener thread (mouse/keyboard).
-        self.activity_listener.activity_detected.connect(
-            self._on_activity_detected, Qt.ConnectionType.QueuedConnection
-        )
+        # Activity listener (for resuming from force break). Emitted from the listener's QTimer tick
+        # on the main thread, so a direct connection is fine.
+        self.activity_listener.activity_detected.connect(self._on_activity_detected)
     
+    def _start_api_call(self, fn: Callable[[], Any], on_result: Callable[[Any], None],
+                        on_error: Callable[[str], None], pool: Optional[QThreadPool] = None):
+        """Run fn on the thread pool (global unless given); on_result / on_error are called on the GUI thread."""
+        worker = _ApiCallWorker(fn)
+        worker.signals.result.connect(on_result, Qt.QueuedConnection)
+        worker.signals.error.connect(on_error, Qt.QueuedConnection)
+        (pool or QThreadPool.globalInstance()).start(worker)
+
     def _handle_login(self, email: str, password: str, remember_me: bool):
-        """Handle login request."""
+        """Handle login request (POST /auth/login runs off the GUI thread)."""
         self.login_window.set_loading(True)
-        QApplication.processEvents()
+        self._start_api_call(
+            partial(self.api_client.login, email, password),
+            partial(self._on_login_result, email),
+            self._on_login_failed,
+            self._session_pool,
+        )
+
+    def _on_login_result(self, email: str, result: dict):
+        """Apply a successful /auth/login response, then sync from /staff/dashboard/stats."""
         try:
-            result = self.api_client.login(email, password)
-            
             session_token = result.get("session_token")
             if not session_token:
                 raise Exception("Login successful but no session token received")
@@ -129,6 +215,11 @@ class AttendanceApp:
             if self.api_client.session_token != session_token:
                 self.api_client.session_token = session_token
             
+            # Saved ETags let the first dashboard fetch after a restart come back as a 304
+            self._cache_owner = email.strip().lower()
+            self.api_client.load_etag_cache(DASHBOARD_CACHE_FILE, self._cache_owner, DASHBOARD_CACHE_TTL_SECONDS)
+            self.usage_tracker.set_owner(self._cache_owner)  # Restores this user's unreported usage on check-in
+            
             # Update state manager
             self.state_manager.set_login_data(
                 session_token,
@@ -139,40 +230,74 @@ class AttendanceApp:
             
             # Switch to dashboard
             self.stacked_widget.setCurrentWidget(self.dashboard_window)
-            self.dashboard_window.set_user_name(user_name)
+            self._apply_if_changed("user_name", self.dashboard_window.set_user_name, user_name)
             # Set shift from login staff_settings so it shows immediately
             ss = staff_settings or {}
-            self.dashboard_window.set_shift_info(
+            self._apply_if_changed(
+                "shift_info",
+                self.dashboard_window.set_shift_info,
                 ss.get("shift_start", ""),
                 ss.get("shift_end", ""),
                 ss.get("timezone", "UTC")
             )
-            # Fetch /staff/dashboard/stats to sync state (is_checked_in, on_break, today_attendance, etc.)
-            self.dashboard_window.set_actions_loading(True)
-            QApplication.processEvents()
-            try:
-                self._fetch_and_sync_dashboard()
-            except Exception as e:
-                print(f"Warning: Could not fetch dashboard stats: {e}")
-            finally:
-                self.dashboard_window.set_actions_loading(False)
-            self._keep_alive_timer.start(60_000)  # POST /staff/keep-alive every 1 minute after login
-            
         except Exception as e:
-            self.login_window.show_error(str(e))
-            QMessageBox.warning(
-                self.login_window,
-                "Login Failed",
-                str(e)
-            )
+            self._on_login_failed(str(e))
+            return
+        self.login_window.set_loading(False)
+        
+        # Fetch /staff/dashboard/stats to sync state (is_checked_in, on_break, today_attendance, etc.)
+        self.dashboard_window.set_actions_loading(True)
+        self._start_api_call(
+            self.api_client.get_dashboard_stats,
+            self._on_login_stats,
+            self._on_login_stats_failed,
+        )
+        self._keep_alive_timer.start(60_000)  # POST /staff/keep-alive every 1 minute after login
+        self._update_poll_timer()
+
+    def _on_login_failed(self, message: str):
+        """Show a login error and clear loading state."""
+        self.login_window.show_error(message)
+        QMessageBox.warning(
+            self.login_window,
+            "Login Failed",
+            message
+        )
+        self.login_window.set_loading(False)
+        self.dashboard_window.set_actions_loading(False)
+
+    def _on_login_stats(self, data: dict):
+        """Apply the post-login dashboard stats."""
+        try:
+            self._apply_dashboard_stats(data)
+        except Exception as e:
+            print(f"Warning: Could not sync dashboard stats: {e}")
         finally:
-            self.login_window.set_loading(False)
             self.dashboard_window.set_actions_loading(False)
+
+    def _on_login_stats_failed(self, message: str):
+        """Post-login dashboard fetch failed: keep the dashboard usable; the poll will retry."""
+        print(f"Warning: Could not fetch dashboard stats: {message}")
+        self.dashboard_window.set_actions_loading(False)
     
-    def _fetch_and_sync_dashboard(self):
-        """Call GET /staff/dashboard/stats and sync state/UI from the response."""
-        data = self.api_client.get_dashboard_stats()
+    def _apply_if_changed(self, key: str, setter: Callable, *args):
+        """Call a dashboard setter only when its arguments differ from the last call (skips relabel/reparse)."""
+        if self._last_applied.get(key) == args:
+            return
+        self._last_applied[key] = args
+        setter(*args)
+
+    def _apply_dashboard_stats(self, data: dict) -> bool:
+        """Sync state/UI from a /staff/dashboard/stats response (GUI thread).
+        Returns True if synced (the sync ends with _refresh_dashboard_state), False if skipped as unchanged."""
+        # Skip the whole state/widget update when the server data and our state are both unchanged
+        digest = hashlib.blake2s(json.dumps(data, sort_keys=True).encode("utf-8")).digest()
+        key = (digest, self.state_manager.state)
+        if key == self._last_dashboard_sync:
+            return False
         self._sync_state_from_dashboard_stats(data)
+        self._last_dashboard_sync = (digest, self.state_manager.state)
+        return True
 
     def _sync_state_from_dashboard_stats(self, data: dict):
         """Sync state and UI from /staff/dashboard/stats.
@@ -195,28 +320,28 @@ class AttendanceApp:
         tz = staff.get("timezone") or ss.get("timezone") or "UTC"
         shift_start = staff.get("shift_start") or ss.get("shift_start") or ""
         shift_end = staff.get("shift_end") or ss.get("shift_end") or ""
-        self.dashboard_window.set_shift_info(shift_start, shift_end, tz)
+        self._apply_if_changed("shift_info", self.dashboard_window.set_shift_info, shift_start, shift_end, tz)
 
         if staff.get("name"):
-            self.dashboard_window.set_user_name(staff["name"])
+            self._apply_if_changed("user_name", self.dashboard_window.set_user_name, staff["name"])
 
         if is_checked_out:
             self.state_manager.set_check_out()
             self.dashboard_window.set_was_checked_in(True)
             self.dashboard_window.reset_timer()
-            self.dashboard_window.set_today_attendance(None)
+            self._apply_if_changed("today_attendance", self.dashboard_window.set_today_attendance, None)
             self._refresh_dashboard_state()
             return
 
         if not is_checked_in:
             self.dashboard_window.set_was_checked_in(False)
             self.dashboard_window.reset_timer()
-            self.dashboard_window.set_today_attendance(None)
+            self._apply_if_changed("today_attendance", self.dashboard_window.set_today_attendance, None)
             self._refresh_dashboard_state()
             return
 
         # is_checked_in True: pass today_attendance so dashboard can compute work time = elapsed - breaks
-        self.dashboard_window.set_today_attendance(today_attendance or {})
+        self._apply_if_changed("today_attendance", self.dashboard_window.set_today_attendance, today_attendance or {})
         check_in_iso = today_attendance.get("check_in") if today_attendance else None
         late_by_sec = today_attendance.get("late_by") if today_attendance else None
         late_by_minutes = (
@@ -229,8 +354,7 @@ class AttendanceApp:
         check_in_time_str = None
         if check_in_iso:
             try:
-                check_in_timestamp = datetime.fromisoformat(check_in_iso.replace("Z", "+00:00"))
-                check_in_timestamp = _to_local_naive(check_in_timestamp)
+                check_in_timestamp = _iso_to_local_naive(check_in_iso)
                 check_in_time_str = check_in_timestamp.strftime("%H:%M")
             except Exception as e:
                 print(f"Error parsing check_in: {e}")
@@ -253,8 +377,7 @@ class AttendanceApp:
                         break
             if start_iso:
                 try:
-                    break_start_timestamp = datetime.fromisoformat(str(start_iso).replace("Z", "+00:00"))
-                    break_start_timestamp = _to_local_naive(break_start_timestamp)
+                    break_start_timestamp = _iso_to_local_naive(str(start_iso))
                     break_time_str = break_start_timestamp.strftime("%H:%M")
                 except Exception as e:
                     print(f"Error parsing break start: {e}")
@@ -295,29 +418,39 @@ class AttendanceApp:
         """POST /staff/keep-alive every 1 minute while logged in."""
         if not self.api_client.session_token:
             return
-        try:
-            self.api_client.keep_alive()
-        except Exception as e:
-            print(f"Keep-alive failed: {e}")
+        self._start_api_call(self.api_client.keep_alive, lambda _result: None, self._on_keep_alive_failed)
+
+    def _on_keep_alive_failed(self, message: str):
+        """Log a failed keep-alive (the next tick retries)."""
+        print(f"Keep-alive failed: {message}")
     
     def _handle_logout(self):
-        """Handle logout request."""
+        """Handle logout request (POST /auth/logout runs off the GUI thread; local state clears now)."""
         try:
             # Stop all services
             self.idle_tracker.stop()
             self.screenshot_service.stop()
             self.usage_tracker.stop()
+            self.usage_tracker.set_owner(None)  # After the flush, which captured the owner
             self._keep_alive_timer.stop()
+            self._sync_epoch += 1  # Drop poll results still in flight
+            
+            self._save_dashboard_cache()
             
             # Logout from API (may fail if already logged out, but that's okay)
-            try:
-                self.api_client.logout()
-            except Exception as e:
-                print(f"Logout API call failed (may already be logged out): {e}")
+            self._start_api_call(self._logout_api, lambda _result: None, self._on_logout_api_failed,
+                                 self._session_pool)
             
             # Clear state
+            self._last_dashboard_sync = None
+            self._last_applied.clear()
             self.state_manager.logout()
             
+            # The token lives until the logout POST runs, so stop the timers here rather than
+            # via _update_poll_timer (which the state change above may have restarted)
+            self._dashboard_poll_timer.stop()
+            self._force_break_timer.stop()
+            
             # Clear login fields
             self.login_window.clear_fields()
             
@@ -327,10 +460,27 @@ class AttendanceApp:
         except Exception as e:
             print(f"Logout error: {e}")
             # Still clear local state even if API call fails
+            self.usage_tracker.set_owner(None)
+            self._last_dashboard_sync = None
+            self._last_applied.clear()
             self.state_manager.logout()
             self.login_window.clear_fields()
             self.stacked_widget.setCurrentWidget(self.login_window)
     
+    def _logout_api(self):
+        """Worker body: let the final usage flush go out, POST /auth/logout (clears the token even on
+        failure), then close pooled connections."""
+        try:
+            if not self.usage_tracker.wait_for_reports(LOGOUT_REPORT_WAIT_MS):
+                print("Usage report still pending at logout; it stays saved for the next session")
+            self.api_client.logout()
+        finally:
+            self.api_client.close()
+
+    def _on_logout_api_failed(self, message: str):
+        """Log a failed logout POST (the token is already cleared locally)."""
+        print(f"Logout API call failed (may already be logged out): {message}")
+
     def _handle_check_in(self):
         """Handle check-in request."""
         if not self.api_client.session_token:
@@ -340,92 +490,108 @@ class AttendanceApp:
                 "Not authenticated. Please login again."
             )
             return
-
-        self.dashboard_window.set_actions_loading(True)
-        QApplication.processEvents()
-        try:
-            self.api_client.check_in()
-            try:
-                self._fetch_and_sync_dashboard()
-            except Exception as e:
-                print(f"Dashboard stats after check-in: {e}")
-        except Exception as e:
-            QMessageBox.warning(
-                self.dashboard_window,
-                "Check-in Failed",
-                str(e)
-            )
-        finally:
-            self.dashboard_window.set_actions_loading(False)
-            self._refresh_dashboard_state()
+        self._run_action(self.api_client.check_in, "Check-in Failed", self._on_check_in_stats_failed)
     
     def _handle_check_out(self):
         """Handle check-out request."""
-        self.dashboard_window.set_actions_loading(True)
-        QApplication.processEvents()
-        try:
-            self.api_client.check_out()
-            try:
-                self._fetch_and_sync_dashboard()
-            except Exception as e:
-                print(f"Dashboard stats after check-out: {e}")
-                self.state_manager.set_check_out()
-                self.dashboard_window.set_was_checked_in(True)
-                self.dashboard_window.reset_timer()
-        except Exception as e:
-            QMessageBox.warning(
-                self.dashboard_window,
-                "Check-out Failed",
-                str(e)
-            )
-        finally:
-            self.dashboard_window.set_actions_loading(False)
-            self._refresh_dashboard_state()
+        self._run_action(self.api_client.check_out, "Check-out Failed", self._on_check_out_stats_failed)
     
     def _handle_start_break(self):
         """Handle start break request."""
-        self.dashboard_window.set_actions_loading(True)
-        QApplication.processEvents()
-        try:
-            self.api_client.start_break()
-            self._fetch_and_sync_dashboard()
-        except Exception as e:
-            QMessageBox.warning(
-                self.dashboard_window,
-                "Break Failed",
-                str(e)
-            )
-        finally:
-            self.dashboard_window.set_actions_loading(False)
-            self._refresh_dashboard_state()
+        self._run_action(self.api_client.start_break, "Break Failed", self._on_break_stats_failed)
     
     def _handle_end_break(self):
         """Handle end break request."""
+        self._run_action(self.api_client.end_break, "Break Failed", self._on_break_stats_failed)
+
+    def _run_action(self, action: Callable[[], Any], failure_title: str,
+                    on_stats_failed: Callable[[str], None]):
+        """Run an attendance POST, then GET /staff/dashboard/stats, on the thread pool; sync UI when done."""
         self.dashboard_window.set_actions_loading(True)
-        QApplication.processEvents()
+        self._sync_epoch += 1
+        self._start_api_call(
+            partial(self._call_then_fetch_stats, action),
+            partial(self._on_action_finished, on_stats_failed),
+            partial(self._on_action_failed, failure_title),
+        )
+
+    def _call_then_fetch_stats(self, action: Callable[[], Any]) -> tuple:
+        """Worker body: action() (errors propagate), then the stats fetch -> (stats or None, error message or None)."""
+        action()
         try:
-            self.api_client.end_break()
-            self._fetch_and_sync_dashboard()
+            return self.api_client.get_dashboard_stats(), None
         except Exception as e:
-            QMessageBox.warning(
-                self.dashboard_window,
-                "Break Failed",
-                str(e)
-            )
-        finally:
-            self.dashboard_window.set_actions_loading(False)
+            return None, str(e)
+
+    def _on_action_finished(self, on_stats_failed: Callable[[str], None], outcome: tuple):
+        """Action succeeded: clear loading, then sync from the fetched stats (or handle the failed fetch)."""
+        stats, stats_error = outcome
+        self.dashboard_window.set_actions_loading(False)
+        synced = False
+        try:
+            if stats_error is None:
+                synced = self._apply_dashboard_stats(stats)
+            else:
+                on_stats_failed(stats_error)
+        except Exception as e:
+            print(f"Dashboard sync after action: {e}")
+        # A completed sync already re-applied the dashboard; only refresh when it didn't run
+        if not synced:
             self._refresh_dashboard_state()
+
+    def _on_action_failed(self, failure_title: str, message: str):
+        """Action POST failed: tell the user, then clear loading."""
+        QMessageBox.warning(
+            self.dashboard_window,
+            failure_title,
+            message
+        )
+        self._finish_action()
+
+    def _finish_action(self):
+        """Clear the action loader and re-apply the dashboard from current state."""
+        self.dashboard_window.set_actions_loading(False)
+        self._refresh_dashboard_state()
+
+    def _on_check_in_stats_failed(self, message: str):
+        """Checked in, but the stats refresh failed; the next poll will sync."""
+        print(f"Dashboard stats after check-in: {message}")
+
+    def _on_check_out_stats_failed(self, message: str):
+        """Checked out, but the stats refresh failed: apply checked-out state locally."""
+        print(f"Dashboard stats after check-out: {message}")
+        self.state_manager.set_check_out()
+        self.dashboard_window.set_was_checked_in(True)
+        self.dashboard_window.reset_timer()
+
+    def _on_break_stats_failed(self, message: str):
+        """Break started/ended, but the stats refresh failed."""
+        QMessageBox.warning(
+            self.dashboard_window,
+            "Break Failed",
+            message
+        )
     
-    def _on_state_changed(self, new_state: AppState):
-        """Handle state change."""
+    def _on_state_changed(self, new_state: int):
+        """Handle state change (new_state is an AppState value)."""
+        self._update_poll_timer()
+        
         # Update UI
+        snap = self.state_manager.snapshot()
         self.dashboard_window.update_state(
             new_state,
-            self.state_manager.check_in_time,
-            self.state_manager.break_start_time,
-            self.state_manager.late_by_minutes
+            snap.check_in_time,
+            snap.break_start_time,
+            snap.late_by_minutes
         )
         
+        # Activity edges are only needed for idle thresholds (checked in) and ending a force break;
+        # otherwise no idle polling at all (logged out, checked out, on break)
+        if new_state == AppState.CHECKED_IN or new_state == AppState.FORCE_BREAK:
+            self.activity_listener.start()
+        else:
+            self.activity_listener.stop()
+        
         # Manage background services based on state
         if new_state == AppState.CHECKED_IN:
             self.idle_tracker.start()
@@ -457,55 +623,145 @@ class AttendanceApp:
         """Handle user data change."""
         # Update dashboard with user name if needed
         if "user_name" in user_data:
-            self.dashboard_window.set_user_name(user_data["user_name"])
+            self._apply_if_changed("user_name", self.dashboard_window.set_user_name, user_data["user_name"])
     
     def _refresh_dashboard_state(self):
         """Re-apply dashboard UI from current state (e.g. after clearing loading)."""
+        snap = self.state_manager.snapshot()
         self.dashboard_window.update_state(
-            self.state_manager.state,
-            self.state_manager.check_in_time,
-            self.state_manager.break_start_time,
-            self.state_manager.late_by_minutes
+            snap.state,
+            snap.check_in_time,
+            snap.break_start_time,
+            snap.late_by_minutes
         )
     
-    def _check_force_break(self):
-        """Every 5s: fetch dashboard stats; maybe enter force break (when checked in and idle)."""
+    def _update_poll_timer(self):
+        """Dashboard poll every 15s while checked in (30s otherwise or minimized); force-break check only while checked in."""
+        if not self.api_client.session_token:
+            self._dashboard_poll_timer.stop()
+            self._force_break_timer.stop()
+            return
+        checked_in = self.state_manager.state == AppState.CHECKED_IN
+        if checked_in and not self._window_minimized:
+            interval = POLL_CHECKED_IN_MS
+        else:
+            interval = POLL_BACKGROUND_MS
+        if not self._dashboard_poll_timer.isActive() or self._dashboard_poll_timer.interval() != interval:
+            self._dashboard_poll_timer.start(interval)
+        if checked_in:
+            if not self._force_break_timer.isActive():
+                self._force_break_timer.start(FORCE_BREAK_CHECK_MS)
+        else:
+            self._force_break_timer.stop()
+
+    def _on_minimized_changed(self, minimized: bool):
+        """Minimized: dashboard poll drops to every 30s and the clock pauses. Restored: sync now and resume."""
+        self._window_minimized = minimized
+        self.dashboard_window.set_minimized(minimized)
+        if minimized:
+            self._save_dashboard_cache()  # Close button minimizes; this is our "closeEvent"
+        self._update_poll_timer()
+        if not minimized and self._dashboard_poll_timer.isActive():
+            self._poll_dashboard()
+
+    def _save_dashboard_cache(self):
+        """Persist the API client's ETag cache for the logged-in user (see load_etag_cache)."""
+        if self._cache_owner and self.api_client.session_token:
+            self.api_client.save_etag_cache(DASHBOARD_CACHE_FILE, self._cache_owner)
+
+    def _poll_dashboard(self):
+        """Every poll tick: fetch dashboard stats on the thread pool and sync state/UI (one poll at a time)."""
+        if self._poll_inflight:
+            return
         if self.api_client.session_token and self.stacked_widget.currentWidget() == self.dashboard_window:
-            try:
-                self._fetch_and_sync_dashboard()
-            except Exception as e:
-                print(f"Dashboard stats poll: {e}")
+            self._poll_inflight = True
+            self._start_api_call(
+                self.api_client.get_dashboard_stats,
+                partial(self._on_poll_stats, self._sync_epoch),
+                self._on_poll_failed,
+            )
+
+    def _on_poll_stats(self, epoch: int, data: dict):
+        """Apply polled stats unless local state changed since the poll started."""
+        self._poll_inflight = False
+        if epoch != self._sync_epoch:
+            return
+        try:
+            self._apply_dashboard_stats(data)
+        except Exception as e:
+            print(f"Dashboard stats poll: {e}")
 
+    def _on_poll_failed(self, message: str):
+        """Log a failed poll (the next tick retries)."""
+        self._poll_inflight = False
+        print(f"Dashboard stats poll: {message}")
+
+    def _check_force_break(self):
+        """Every second while checked in: enter force break once idle reaches force_break_time."""
         if self.state_manager.state != AppState.CHECKED_IN:
             return
 
-        seconds_since_activity = self.activity_listener.get_seconds_since_last_activity()
-        force_break_seconds = self.state_manager.force_break_time
-        if seconds_since_activity >= force_break_seconds:
-            try:
-                self.api_client.force_break_start()
-                break_start_time = datetime.now().strftime("%H:%M")
-                self.state_manager.set_break_start(break_start_time, is_force=True)
-                self.dashboard_window.set_break_freeze(datetime.now())
-            except Exception as e:
-                print(f"Failed to trigger force break: {e}")
+        # Monotonic idle time in integer ns (wall-clock jumps from DST / NTP can't trigger a break)
+        idle_ns = self.activity_listener.get_ns_since_last_activity()
+        if idle_ns >= self.state_manager.force_break_time * 1_000_000_000:
+            if self._force_break_inflight or time.monotonic() < self._force_break_retry_at:
+                return
+            self._force_break_inflight = True
+            self._sync_epoch += 1
+            now = datetime.now()  # Wall clock only for the displayed break start
+            self._start_api_call(
+                self.api_client.force_break_start,
+                partial(self._on_force_break_started, now),
+                self._on_force_break_failed,
+            )
+
+    def _on_force_break_started(self, started_at: datetime, _result: Any):
+        """Server accepted the force break: enter FORCE_BREAK (unless the user left CHECKED_IN meanwhile)."""
+        self._force_break_inflight = False
+        if self.state_manager.state != AppState.CHECKED_IN:
+            return
+        self.state_manager.set_break_start(started_at.strftime("%H:%M"), is_force=True)
+        self.dashboard_window.set_break_freeze(started_at)
+
+    def _on_force_break_failed(self, message: str):
+        """Force-break POST failed: wait a little before trying again."""
+        self._force_break_inflight = False
+        print(f"Failed to trigger force break: {message}")
+        self._force_break_retry_at = time.monotonic() + FORCE_BREAK_RETRY_SECONDS
 
     def _end_force_break_on_activity(self):
         """End force break and hit end-break API. Only called when user actually moves mouse or presses keyboard (activity_detected signal)."""
         if self.state_manager.state != AppState.FORCE_BREAK:
             return
         self.state_manager.set_break_end()
+        snap = self.state_manager.snapshot()
         self.dashboard_window.update_state(
-            self.state_manager.state,
-            self.state_manager.check_in_time,
-            self.state_manager.break_start_time,
-            self.state_manager.late_by_minutes,
+            snap.state,
+            snap.check_in_time,
+            snap.break_start_time,
+            snap.late_by_minutes,
         )
+        self._sync_epoch += 1
+        self._start_api_call(
+            partial(self._call_then_fetch_stats, self.api_client.end_break),
+            self._on_force_break_ended,
+            self._on_force_break_end_failed,
+        )
+
+    def _on_force_break_ended(self, outcome: tuple):
+        """Server ended the force break: sync from the fetched stats (a failed fetch is left to the poll)."""
+        stats, stats_error = outcome
+        if stats_error is not None:
+            print(f"Dashboard stats after end force break: {stats_error}")
+            return
         try:
-            self.api_client.end_break()
-            self._fetch_and_sync_dashboard()
+            self._apply_dashboard_stats(stats)
         except Exception as e:
-            print(f"Failed to notify server of end force break: {e}")
+            print(f"Dashboard sync after end force break: {e}")
+
+    def _on_force_break_end_failed(self, message: str):
+        """Log a failed end-break POST after a force break."""
+        print(f"Failed to notify server of end force break: {message}")
 
     def _on_activity_detected(self):
         """When user moves mouse or presses any keyboard key during force break → hit end-break API immediately."""
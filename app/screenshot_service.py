@@ -2,23 +2,117 @@
 Screenshot capture service.
 Captures full-screen screenshots, compresses (resize + JPEG), and uploads to API.
 """
-import base64
+import binascii
+import hashlib
 import io
-from PySide6.QtCore import QObject, Signal, QTimer
-from mss import mss
-from PIL import Image
+import threading
+from typing import Callable, Dict, Optional
+from PySide6.QtCore import Qt, QObject, Signal, QTimer, QRunnable, QThreadPool
 from .state_manager import StateManager, AppState
 from .api_client import APIClient
+from .config import DEBUG, SCREENSHOT_UPLOAD_MODE
 
 # Compress to reduce payload size and avoid timeouts / "entity too large"
 MAX_DIMENSION = 1280   # max width or height (keeps aspect ratio)
 JPEG_QUALITY = 75      # 1-95; lower = smaller file
+# PIL / mss are imported on first ScreenshotService.start() (keeps them off the login-screen startup path)
+Image = None
+mss = None
+_RESAMPLE = None  # Bilinear: several times cheaper than LANCZOS and indistinguishable after JPEG q75
+FRAME_HASH_SIZE = (64, 64)  # Grayscale thumbnail hashed to detect an unchanged screen
+
+
+def _load_capture_libs():
+    """Import PIL and mss once (GUI thread, before any capture worker runs)."""
+    global Image, mss, _RESAMPLE
+    if Image is not None:
+        return
+    from mss import mss as _mss
+    from PIL import Image as _Image
+    _RESAMPLE = getattr(_Image, "Resampling", _Image).BILINEAR
+    mss = _mss
+    Image = _Image
+
+
+class _ScreenshotWorkerSignals(QObject):
+    """Signals for _ScreenshotWorker (QRunnable is not a QObject); delivered queued on the GUI thread."""
+
+    finished = Signal()  # Captured (and upload queued, unless the screen was unchanged)
+    error = Signal(str)
+
+
+class _ScreenshotWorker(QRunnable):
+    """Captures, compresses and queues one screenshot upload on a QThreadPool thread."""
+
+    def __init__(self, api_client: APIClient, state_manager: StateManager, monitor: Dict[str, int],
+                 last_frame_hash: Optional[bytes], cancelled: threading.Event,
+                 on_uploaded: Callable[[bytes, str], None], jpeg_buf: io.BytesIO):
+        super().__init__()
+        self.api_client = api_client
+        self.state_manager = state_manager
+        self.monitor = monitor  # Full-screen geometry read by ScreenshotService.start() ({} = read it here)
+        self.last_frame_hash = last_frame_hash
+        self.cancelled = cancelled  # Set by ScreenshotService.stop()
+        self.jpeg_buf = jpeg_buf  # The service's reused output buffer (one capture at a time)
+        self.on_uploaded = on_uploaded  # (frame_hash, error or "") once the queued upload is settled; sender thread
+        self.signals = _ScreenshotWorkerSignals()
+
+    def run(self):
+        """Capture full screen → resize → JPEG → upload (runs off the GUI thread)."""
+        try:
+            # Capture full screen. mss is not thread-safe and holds OS handles (GDI DCs on Windows):
+            # one instance per capture, closed right after the grab
+            with mss() as sct:
+                screenshot = sct.grab(self.monitor or sct.monitors[0])
+            w, h = screenshot.size
+
+            # Wrap mss RGB bytes as a PIL Image without copying them
+            img = Image.frombuffer("RGB", (w, h), screenshot.rgb, "raw", "RGB", 0, 1)
+
+            # Screen unchanged since the last delivered upload (reading, locked screen): skip encode + upload
+            thumb = img.resize(FRAME_HASH_SIZE, _RESAMPLE).convert("L").tobytes()
+            frame_hash = hashlib.blake2s(thumb, digest_size=16).digest()
+            if frame_hash == self.last_frame_hash:
+                self.signals.finished.emit()
+                return
+
+            # Resize if larger than MAX_DIMENSION to reduce size
+            if w > MAX_DIMENSION or h > MAX_DIMENSION:
+                img.thumbnail((MAX_DIMENSION, MAX_DIMENSION), _RESAMPLE)
+
+            # Compress as JPEG (much smaller than PNG) into the service's reused buffer.
+            # optimize=False: the second Huffman pass costs ~2x encode time for ~1-3% smaller files.
+            buf = self.jpeg_buf
+            buf.seek(0)
+            buf.truncate(0)
+            img.save(buf, format="JPEG", quality=JPEG_QUALITY, optimize=False)
+
+            # Service stopped or user left CHECKED_IN during capture/encode: don't upload
+            if self.cancelled.is_set() or self.state_manager.state != AppState.CHECKED_IN:
+                self.signals.error.emit("cancelled (no longer checked in)")
+                return
+
+            # Upload to API (short timeout; a stalled upload is dropped). The frame only counts for
+            # dedup once the sender confirms delivery, so a failed or dropped upload is retried next tick.
+            on_uploaded = self.on_uploaded  # Not self: the runnable is deleted when run() returns
+            on_done = lambda error: on_uploaded(frame_hash, error or "")
+            if SCREENSHOT_UPLOAD_MODE == "base64":
+                # Encode straight from the buffer: no intermediate bytes copy of the JPEG
+                screenshot_base64 = binascii.b2a_base64(buf.getbuffer(), newline=False).decode("ascii")
+                self.api_client.upload_screenshot(screenshot_base64, on_done=on_done)
+            else:
+                self.api_client.upload_screenshot_bytes(buf.getvalue(), on_done=on_done)
+
+            self.signals.finished.emit()
+        except Exception as e:
+            self.signals.error.emit(str(e))
 
 
 class ScreenshotService(QObject):
     """Captures and uploads screenshots."""
     
     screenshot_captured = Signal()  # Emitted after successful capture
+    _upload_settled = Signal(bytes, str)  # frame hash, error ("" = delivered); emitted from the API sender thread
     
     def __init__(self, state_manager: StateManager, api_client: APIClient):
         super().__init__()
@@ -28,7 +122,17 @@ class ScreenshotService(QObject):
         self._timer = QTimer()
         self._timer.timeout.connect(self._capture_and_upload)
         self._is_active = False
-        self._mss_instance = mss()
+        self._last_frame_hash: Optional[bytes] = None  # Hash of the last captured frame (dedup)
+        # One capture at a time on our own pool; a tick while one is still running is dropped
+        self._capture_pool = QThreadPool()
+        self._capture_pool.setMaxThreadCount(1)
+        self._inflight = 0
+        # JPEG output buffer handed to each worker; safe to share because only one capture runs at a time
+        # (threading.local can't hold it: PySide6 gives every QRunnable.run a fresh Python thread state)
+        self._jpeg_buf = io.BytesIO()
+        self._cancelled = threading.Event()  # Replaced on every start(); set by stop()
+        self._upload_settled.connect(self._on_upload_settled, Qt.QueuedConnection)
+        self._monitor: Dict[str, int] = {}  # Full-screen geometry, re-read once per checked-in session
     
     def start(self):
         """Start screenshot service."""
@@ -43,7 +147,16 @@ class ScreenshotService(QObject):
         if self.state_manager.state != AppState.CHECKED_IN:
             return
         
+        _load_capture_libs()
+        try:
+            with mss() as sct:  # Displays may have changed since the last session
+                self._monitor = dict(sct.monitors[0])
+        except Exception as e:
+            print(f"Failed to read screen geometry: {e}")
+            self._monitor = {}  # Workers read it per capture instead
         self._is_active = True
+        self._last_frame_hash = None  # First capture after check-in is always sent
+        self._cancelled = threading.Event()
         # API sends screenshot_interval in minutes; state_manager gives seconds
         interval_ms = self.state_manager.screenshot_interval_seconds * 1000
         self._timer.start(int(interval_ms))
@@ -55,9 +168,12 @@ class ScreenshotService(QObject):
         
         self._is_active = False
         self._timer.stop()
+        # Abort a capture in progress and drop queued uploads from this session
+        self._cancelled.set()
+        self.api_client.drop_queued("screenshot")
     
     def _capture_and_upload(self):
-        """Capture screenshot and upload to API."""
+        """Hand one capture/upload to the thread pool."""
         # Check if we should still be capturing
         if self.state_manager.state != AppState.CHECKED_IN:
             self.stop()
@@ -67,29 +183,31 @@ class ScreenshotService(QObject):
             self.stop()
             return
         
-        try:
-            # Capture full screen
-            screenshot = self._mss_instance.grab(self._mss_instance.monitors[0])
-            w, h = screenshot.size
-
-            # Build PIL Image from mss RGB bytes
-            img = Image.frombytes("RGB", (w, h), screenshot.rgb)
-
-            # Resize if larger than MAX_DIMENSION to reduce size
-            if w > MAX_DIMENSION or h > MAX_DIMENSION:
-                resample = getattr(Image, "Resampling", Image).LANCZOS
-                img.thumbnail((MAX_DIMENSION, MAX_DIMENSION), resample)
-
-            # Compress as JPEG (much smaller than PNG)
-            buf = io.BytesIO()
-            img.save(buf, format="JPEG", quality=JPEG_QUALITY, optimize=True)
-            jpeg_bytes = buf.getvalue()
+        if self._inflight > 0:
+            if DEBUG:
+                print("[DEBUG] Previous screenshot still in progress; skipping this capture")
+            return
+        
+        # Capture + encode + upload run on a pool thread so the UI never stalls
+        worker = _ScreenshotWorker(self.api_client, self.state_manager, self._monitor,
+                                   self._last_frame_hash, self._cancelled,
+                                   self._upload_settled.emit, self._jpeg_buf)
+        worker.signals.finished.connect(self._on_worker_finished, Qt.QueuedConnection)
+        worker.signals.error.connect(self._on_worker_error, Qt.QueuedConnection)
+        self._inflight += 1
+        self._capture_pool.start(worker)
 
-            screenshot_base64 = base64.b64encode(jpeg_bytes).decode("utf-8")
+    def _on_worker_finished(self):
+        """Capture done (GUI thread)."""
+        self._inflight -= 1
+        self.screenshot_captured.emit()
 
-            # Upload to API (uses longer timeout)
-            self.api_client.upload_screenshot(screenshot_base64)
+    def _on_upload_settled(self, frame_hash: bytes, error: str):
+        """Remember a delivered frame's hash for dedup (GUI thread); failed/dropped uploads are resent next tick."""
+        if self._is_active and not error:
+            self._last_frame_hash = frame_hash
 
-            self.screenshot_captured.emit()
-        except Exception as e:
-            print(f"Failed to capture/upload screenshot: {e}")
+    def _on_worker_error(self, message: str):
+        """Log a failed capture/upload (GUI thread)."""
+        self._inflight -= 1
+        print(f"Failed to capture/upload screenshot: {message}")
@@ -2,24 +2,64 @@
 Central state manager for the attendance tracking application.
 Manages application state and notifies observers of state changes.
 """
-from enum import Enum
-from typing import Optional, Dict, Any, Callable, List
+from __future__ import annotations
+
+import sys
+from collections import namedtuple
+from contextlib import contextmanager
+from enum import IntEnum
+from functools import cached_property
+from types import MappingProxyType
+from typing import TYPE_CHECKING
 from PySide6.QtCore import QObject, Signal
 
+if TYPE_CHECKING:  # Annotations are strings (PEP 563): typing generics only for checkers
+    from typing import Optional, Dict, Any, Callable, Iterator, List, Mapping, Tuple
+
+
+class AppState(IntEnum):
+    """Application states (ints: state checks on timer ticks are plain int compares)."""
+    LOGGED_OUT = 0
+    CHECKED_IN = 1
+    ON_BREAK = 2
+    FORCE_BREAK = 3
+
+
+# String form of each state (the former Enum values), indexed by AppState; persistence / wire only
+_STATE_WIRE: Tuple[str, ...] = tuple(sys.intern(name) for name in ("logged_out", "checked_in", "on_break", "force_break"))
+
+
+# Immutable view of everything the UI reads after a change: one call instead of N property reads
+StateSnapshot = namedtuple(
+    "StateSnapshot",
+    "state session_token user_name check_in_time break_start_time late_by_minutes force_break_seconds allow_screenshot",
+)
+
+
+# cached_property names derived from _staff_settings (each named after the key it reads)
+_STAFF_SETTINGS_CACHED = frozenset({"allow_screenshot"})
 
-class AppState(Enum):
-    """Application states."""
-    LOGGED_OUT = "logged_out"
-    CHECKED_IN = "checked_in"
-    ON_BREAK = "on_break"
-    FORCE_BREAK = "force_break"
+# staff keys merge_staff_settings accepts from dashboard stats
+_MERGEABLE_STAFF_KEYS = frozenset({
+    "force_break_time", "allow_screenshot", "screenshot_interval", "usage_policy_enabled",
+    "shift_start", "shift_end", "timezone", "grace_period", "department",
+})
 
 
 class StateManager(QObject):
     """Manages application state and provides signals for state changes."""
     
+    # Slot descriptors for the hot fields. No '__dict__' entry: the QObject wrapper already has
+    # an instance dict, which cached_property (allow_screenshot) keeps using.
+    __slots__ = (
+        "_state", "_session_token", "_staff_settings", "_staff_settings_owned", "_force_break_seconds",
+        "_company_rules", "_user_name", "_check_in_time", "_break_start_time", "_late_by_minutes",
+        "_idle_thresholds_ns", "_batch_depth", "_signal_buffer", "_batch_start_state", "_observers",
+        "_snapshot", "_state_depth", "_pending_state", "_emitters",
+    )
+    
     # Signals
-    state_changed = Signal(AppState)
+    state_changed = Signal(int)  # AppState value: marshalled as a native int, compares equal to AppState members
     user_data_changed = Signal(dict)
     
     def __init__(self):
@@ -27,11 +67,29 @@ class StateManager(QObject):
         self._state = AppState.LOGGED_OUT
         self._session_token: Optional[str] = None
         self._staff_settings: Optional[Dict[str, Any]] = None
-        self._company_rules: Optional[Dict[str, Any]] = None
+        self._staff_settings_owned = False  # False while _staff_settings is still the caller's login dict
+        self._force_break_seconds = 300  # Derived from staff force_break_time (see _recompute_derived)
+        self._company_rules: Optional[Mapping[str, Any]] = None  # Read-only view; safe to share
         self._user_name: Optional[str] = None
         self._check_in_time: Optional[str] = None
         self._break_start_time: Optional[str] = None
         self._late_by_minutes: Optional[int] = None
+        self._idle_thresholds_ns: Optional[List[int]] = None  # Cached; company_rules only change on login/logout
+        # batch(): signal name -> latest payload, emitted once when the outermost batch exits
+        self._batch_depth = 0
+        self._signal_buffer: Optional[Dict[str, Any]] = None
+        self._batch_start_state: Optional[AppState] = None
+        # Plain-Python observers (same thread), called before the Qt signal of the same name
+        self._observers: Dict[str, List[Callable[[Any], None]]] = {"state_changed": [], "user_data_changed": []}
+        # Bound emit per signal, resolved once (signal instances live as long as the object)
+        self._emitters: Dict[str, Callable[[Any], None]] = {
+            "state_changed": self.state_changed.emit,
+            "user_data_changed": self.user_data_changed.emit,
+        }
+        self._snapshot: Optional[StateSnapshot] = None  # Built on demand by snapshot(); None = stale
+        # Re-entrancy guard for the state setter (see state.setter)
+        self._state_depth = 0
+        self._pending_state: Optional[AppState] = None
     
     @property
     def state(self) -> AppState:
@@ -40,10 +98,75 @@ class StateManager(QObject):
     
     @state.setter
     def state(self, new_state: AppState):
-        """Set state and emit signal."""
-        if self._state != new_state:
-            self._state = new_state
-            self.state_changed.emit(new_state)
+        """Set state and emit signal. A transition requested by an observer mid-dispatch is queued (last wins)."""
+        if self._state_depth:
+            self._pending_state = new_state
+            return
+        self._state_depth += 1
+        try:
+            # Loop instead of recursing: each queued transition is applied after the previous dispatch returns
+            while new_state is not None and self._state != new_state:
+                self._state = new_state
+                self._snapshot = None
+                self._emit("state_changed", int(new_state))
+                new_state, self._pending_state = self._pending_state, None
+        finally:
+            self._state_depth -= 1
+    
+    def snapshot(self) -> StateSnapshot:
+        """Current state and session fields as one immutable tuple (rebuilt only after a change)."""
+        snap = self._snapshot
+        if snap is None:
+            snap = self._snapshot = StateSnapshot(
+                self._state, self._session_token, self._user_name, self._check_in_time,
+                self._break_start_time, self._late_by_minutes, self._force_break_seconds,
+                self.allow_screenshot,
+            )
+        return snap
+    
+    def wire_name(self) -> str:
+        """Current state as its interned wire string ("logged_out", "checked_in", ...)."""
+        return _STATE_WIRE[self._state]
+    
+    def on_state_change(self, callback: Callable[[int], None]):
+        """Register a GUI-thread observer for state changes (direct call, no Qt dispatch)."""
+        self._observers["state_changed"].append(callback)
+    
+    def on_data_change(self, callback: Callable[[dict], None]):
+        """Register a GUI-thread observer for user data changes (direct call, no Qt dispatch)."""
+        self._observers["user_data_changed"].append(callback)
+    
+    def _dispatch(self, signal_name: str, payload: Any):
+        """Call registered observers, then emit the Qt signal (for Qt-connected consumers)."""
+        for callback in self._observers[signal_name]:
+            callback(payload)
+        self._emitters[signal_name](payload)
+    
+    def _emit(self, signal_name: str, payload: Any):
+        """Dispatch now, or buffer (last write wins per signal) while inside batch()."""
+        if self._signal_buffer is not None:
+            self._signal_buffer[signal_name] = payload
+        else:
+            self._dispatch(signal_name, payload)
+    
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Coalesce signals from a compound update: each signal fires at most once, on the outermost exit."""
+        if self._batch_depth == 0:
+            self._signal_buffer = {}
+            self._batch_start_state = self._state
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                buffered, self._signal_buffer = self._signal_buffer, None
+                # A state that ended where it started (A -> B -> A) is not a change
+                if buffered.get("state_changed", self._batch_start_state) == self._batch_start_state:
+                    buffered.pop("state_changed", None)
+                for signal_name, payload in buffered.items():
+                    self._dispatch(signal_name, payload)
     
     @property
     def session_token(self) -> Optional[str]:
@@ -56,8 +179,8 @@ class StateManager(QObject):
         return self._staff_settings
     
     @property
-    def company_rules(self) -> Optional[Dict[str, Any]]:
-        """Get company rules."""
+    def company_rules(self) -> Optional[Mapping[str, Any]]:
+        """Get company rules (read-only mapping; share it freely, it can't change under a cache)."""
         return self._company_rules
     
     @property
@@ -88,9 +211,9 @@ class StateManager(QObject):
             return bool(v) if isinstance(v, bool) else (v == "yes" or v == True)
         return False
 
-    @property
+    @cached_property
     def allow_screenshot(self) -> bool:
-        """Check if screenshots are allowed."""
+        """Check if screenshots are allowed (cached until staff settings change)."""
         if self._staff_settings:
             allow = self._staff_settings.get("allow_screenshot", False)
             # Handle both boolean and string "yes"/"no" formats
@@ -101,11 +224,8 @@ class StateManager(QObject):
     
     @property
     def force_break_time(self) -> int:
-        """Get force break time in seconds (API sends minutes)."""
-        if self._staff_settings:
-            force_break_minutes = self._staff_settings.get("force_break_time", 5)
-            return int(force_break_minutes) * 60  # minutes -> seconds
-        return 300  # Default 5 minutes in seconds
+        """Get force break time in seconds (API sends minutes; converted when staff settings change)."""
+        return self._force_break_seconds
 
     @property
     def screenshot_interval_seconds(self) -> int:
@@ -125,61 +245,109 @@ class StateManager(QObject):
             t3 = self._company_rules.get("idle3_time", defaults[2])
             return sorted([int(t1) * 60, int(t2) * 60, int(t3) * 60])
         return [d * 60 for d in defaults]
+
+    @property
+    def idle_report_thresholds_ns(self) -> List[int]:
+        """idle_report_thresholds_seconds in nanoseconds (sorted), converted once per login."""
+        if self._idle_thresholds_ns is None:
+            self._idle_thresholds_ns = [t * 1_000_000_000 for t in self.idle_report_thresholds_seconds]
+        return self._idle_thresholds_ns
+    
+    def _invalidate_staff_settings_cache(self):
+        """Drop cached_property values computed from _staff_settings and recompute derived fields."""
+        for name in _STAFF_SETTINGS_CACHED:
+            self.__dict__.pop(name, None)
+        self._recompute_derived()
+
+    def _recompute_derived(self):
+        """Recompute plain attributes derived from _staff_settings (read on every timer tick)."""
+        self._snapshot = None
+        if self._staff_settings:
+            force_break_minutes = self._staff_settings.get("force_break_time", 5)
+            self._force_break_seconds = int(force_break_minutes) * 60  # minutes -> seconds
+        else:
+            self._force_break_seconds = 300  # Default 5 minutes in seconds
     
     def set_login_data(self, session_token: str, staff_settings: Dict[str, Any], 
                       company_rules: Dict[str, Any], user_name: str): 
-        """Set login data after successful login."""
-        self._session_token = session_token
-        self._staff_settings = dict(staff_settings) if staff_settings else {}
-        self._company_rules = company_rules
-        self._user_name = user_name
-        self.state = AppState.LOGGED_OUT  # Start logged out, need to check-in
-        self.user_data_changed.emit({
-            "user_name": user_name,
-            "staff_settings": staff_settings,
-            "company_rules": company_rules
-        })
+        """Set login data after successful login. No-op (no signals) if identical to the current login."""
+        if (self._session_token == session_token and self._user_name == user_name
+                and self._staff_settings == (staff_settings or {}) and self._company_rules == (company_rules or {})):
+            return
+        with self.batch():
+            self._session_token = session_token
+            # Kept by reference; merge_staff_settings copies it before its first write
+            self._staff_settings = staff_settings if staff_settings else {}
+            self._staff_settings_owned = not staff_settings
+            self._invalidate_staff_settings_cache()
+            self._company_rules = MappingProxyType(company_rules or {})
+            self._idle_thresholds_ns = None
+            self._user_name = user_name
+            self.state = AppState.LOGGED_OUT  # Start logged out, need to check-in
+            self._emit("user_data_changed", {
+                "user_name": user_name,
+                "staff_settings": staff_settings,
+                "company_rules": company_rules
+            })
 
     def merge_staff_settings(self, updates: Dict[str, Any]) -> None:
         """Merge keys (e.g. from staff in dashboard stats) into _staff_settings."""
         if not updates:
             return
-        if self._staff_settings is None:
-            self._staff_settings = {}
-        for k in ("force_break_time", "allow_screenshot", "screenshot_interval", "usage_policy_enabled", "shift_start", "shift_end", "timezone", "grace_period", "department"):
-            if k in updates:
-                self._staff_settings[k] = updates[k]
+        for k, v in updates.items():
+            if k not in _MERGEABLE_STAFF_KEYS:
+                continue
+            if not self._staff_settings_owned:
+                # Own the dict before the first write (never write into the login payload)
+                self._staff_settings = dict(self._staff_settings) if self._staff_settings else {}
+                self._staff_settings_owned = True
+            self._staff_settings[k] = v
+            if k in _STAFF_SETTINGS_CACHED:
+                self.__dict__.pop(k, None)
+                self._snapshot = None
+            elif k == "force_break_time":
+                self._recompute_derived()
     
     def set_check_in(self, check_in_time: str, late_by_minutes: Optional[int] = None):
         """Set check-in data."""
-        self._check_in_time = check_in_time
+        # Interned: idempotent re-syncs hand us equal strings, so equality checks hit the identity fast path
+        self._check_in_time = sys.intern(check_in_time) if check_in_time else None
         self._late_by_minutes = late_by_minutes
+        self._snapshot = None
         self.state = AppState.CHECKED_IN
     
     def set_break_start(self, break_start_time: str, is_force: bool = False):
         """Set break start data."""
-        self._break_start_time = break_start_time
+        self._break_start_time = sys.intern(break_start_time) if break_start_time else None
+        self._snapshot = None
         self.state = AppState.FORCE_BREAK if is_force else AppState.ON_BREAK
     
     def set_break_end(self):
         """End break and return to checked in."""
         self._break_start_time = None
+        self._snapshot = None
         self.state = AppState.CHECKED_IN
     
     def set_check_out(self):
         """Set check-out data."""
-        self._check_in_time = None
-        self._break_start_time = None
-        self._late_by_minutes = None
-        self.state = AppState.LOGGED_OUT
+        self._reset_session(full=False)
     
     def logout(self):
         """Clear all data and return to logged out state."""
-        self._session_token = None
-        self._staff_settings = None
-        self._company_rules = None
-        self._user_name = None
+        self._reset_session(full=True)
+    
+    def _reset_session(self, full: bool):
+        """Clear attendance fields (and login data too when full), then set LOGGED_OUT: one state emission."""
         self._check_in_time = None
         self._break_start_time = None
         self._late_by_minutes = None
-        self.state = AppState.LOGGED_OUT
+        self._snapshot = None
+        if full:
+            self._session_token = None
+            self._staff_settings = None
+            self._staff_settings_owned = False
+            self._invalidate_staff_settings_cache()
+            self._company_rules = None
+            self._idle_thresholds_ns = None
+            self._user_name = None
+        self.state = AppState.LOGGED_OUT  # Single signal emission point
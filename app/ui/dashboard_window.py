@@ -2,16 +2,17 @@
 Dashboard window UI matching the provided design.
 Shows different states: Checked In, On Break, Force Break, Checked Out.
 """
-import os
-import re
 import sys
+import time
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
+from typing import Dict, Tuple
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFrame, QProgressBar
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QProgressBar
 )
-from PySide6.QtCore import Qt, Signal, QTimer, QPoint, QPointF, QSize
-from PySide6.QtGui import QFont, QIcon, QImage, QPixmap, QPainter, QColor, QMouseEvent
+from PySide6.QtCore import Qt, Signal, QTimer, QPoint, QPointF
+from PySide6.QtGui import QFont, QIcon, QImage, QPixmap, QPainter, QColor, QMouseEvent, QShowEvent, QHideEvent
 from PySide6.QtSvg import QSvgRenderer
 from ..config import (
     COLOR_PRIMARY, COLOR_SUCCESS, COLOR_ALERT, COLOR_TEXT_DARK, 
@@ -20,14 +21,81 @@ from ..config import (
 )
 from ..state_manager import AppState
 
+# One stylesheet for the whole window, formatted once at import: widgets are matched by objectName, and
+# state-dependent looks are dynamic properties (look / tone) flipped in update_state, never per-widget sheets
+_DASHBOARD_QSS = f"""
+    QWidget {{
+        background-color: {COLOR_BACKGROUND_DARK};
+    }}
+    #cardContainer, #cardContainer QWidget {{
+        background-color: {COLOR_BACKGROUND};
+        border-radius: 25px;
+    }}
+    QLabel[tone="dark"] {{ color: {COLOR_TEXT_DARK}; }}
+    QLabel[tone="light"] {{ color: {COLOR_TEXT_LIGHT}; }}
+    QLabel[tone="success"] {{ color: {COLOR_SUCCESS}; }}
+    QLabel[tone="alert"] {{ color: {COLOR_ALERT}; }}
+    #cardContainer QPushButton#logoutButton,
+    #cardContainer QPushButton#logoutButton:hover {{
+        background-color: transparent;
+        border: none;
+    }}
+    #cardContainer QProgressBar#loadingProgress {{
+        border: none;
+        border-radius: 3px;
+        background: {COLOR_BORDER_LIGHT};
+    }}
+    #cardContainer QProgressBar#loadingProgress::chunk {{
+        background: {COLOR_PRIMARY};
+        border-radius: 3px;
+    }}
+    #cardContainer QLabel#lateBadge {{
+        background-color: #f0f0f0;
+        color: {COLOR_TEXT_LIGHT};
+        border: 1px solid {COLOR_BORDER_LIGHT};
+        border-radius: 12px;
+        padding: 4px 12px;
+    }}
+    #cardContainer QPushButton[look="primary"] {{
+        background-color: {COLOR_PRIMARY};
+        border: none;
+        border-radius: 60px;
+    }}
+    #cardContainer QPushButton[look="inactive"] {{
+        background-color: {COLOR_BACKGROUND};
+        border: 2px solid {COLOR_BORDER_LIGHT};
+        border-radius: 60px;
+    }}
+    #cardContainer QPushButton[look="alert"] {{
+        background-color: {COLOR_ALERT};
+        border: none;
+        border-radius: 60px;
+    }}
+"""
+
+# Every (icon_type, color, size) the dashboard shows; baked into the icon cache right after construction
+_DASHBOARD_ICON_KEYS = (
+    ("power", COLOR_TEXT_DARK, 20),
+    ("arrow_right", "white", 60),
+    ("arrow_left", "white", 60),
+    ("arrow_left", COLOR_TEXT_DARK, 60),
+    ("pause", "white", 60),
+    ("pause", COLOR_TEXT_DARK, 60),
+    ("play", "white", 60),
+)
+
+
+@lru_cache(maxsize=64)
+def _tint_color(color: str) -> QColor:
+    """Parsed icon tint color (COLOR_TEXT_DARK if color doesn't parse). Shared: don't mutate the result."""
+    qc = QColor(color)
+    return qc if qc.isValid() else QColor(COLOR_TEXT_DARK)
+
 
 def _to_local_naive(dt: datetime):
     """Convert timezone-aware datetime to local naive for use with datetime.now()."""
-    if dt is None:
-        return None
-    if getattr(dt, "tzinfo", None) is not None:
-        return dt.astimezone().replace(tzinfo=None)
-    return dt
+    # Naive (and None) pass straight through; datetime always has .tzinfo
+    return dt if dt is None or dt.tzinfo is None else dt.astimezone().replace(tzinfo=None)
 
 
 class DashboardWindow(QWidget):
@@ -39,16 +107,42 @@ class DashboardWindow(QWidget):
     start_break_requested = Signal()
     end_break_requested = Signal()
     
+    # Built icons keyed by (icon_type, color, size); QIcon is implicitly shared, so one instance serves every button
+    _icon_cache: Dict[Tuple[str, str, int], QIcon] = {}
+    # Color-independent SVG renders keyed by (icon_name, size); each color is a SourceIn fill over a copy
+    _svg_mask_cache: Dict[Tuple[str, int], QPixmap] = {}
+    
     def __init__(self):
         super().__init__()
         self._timer = QTimer()
+        self._timer.setInterval(1000)  # Update every second (only while running: see _sync_timer)
         self._timer.timeout.connect(self._update_time)
-        self._timer.start(1000)  # Update every second
+        self._last_time_text = None  # Text last put in time_label (skip identical setText)
+        self._minimized = False  # Top-level window minimized (see set_minimized)
         self._check_in_timestamp = None
+        self._check_in_epoch = None  # _check_in_timestamp as epoch seconds: the running tick is float math only
         self._break_start_timestamp = None  # When set, timer is frozen (on break)
         self._today_attendance_breaks = None  # List of (start_dt, end_dt) for work time = elapsed - breaks
+        # Summary of _today_attendance_breaks, so the per-tick total doesn't rescan closed breaks
+        self._closed_break_seconds = 0.0
+        self._closed_breaks_end = None  # Latest end_dt among closed breaks
+        self._open_break_starts = ()  # start_dt of breaks without an end (normally zero or one)
+        self._closed_breaks_end_epoch = None  # Epoch-seconds copies of the two above, for the running tick
+        self._open_break_start_epochs = ()
         self._drag_position = QPoint()
         self._was_checked_in = False  # Track if user was previously checked in
+        self._last_update_args = None  # update_state arguments last rendered (None = render next call)
+        self._button_icon_keys: Dict[str, Tuple[str, str, int]] = {}  # button -> icon key applied
+        self._actions_loading = False
+        # Bound emit of the request each action button sends right now (set in update_state, not the deferred render)
+        self._check_action = self.check_in_requested.emit
+        self._break_action = self.start_break_requested.emit
+        # update_state bursts (login -> dashboard sync -> status) render once, one frame after the last call
+        self._pending_state_args = None
+        self._pending_state_timer = QTimer()
+        self._pending_state_timer.setSingleShot(True)
+        self._pending_state_timer.setInterval(16)
+        self._pending_state_timer.timeout.connect(self._apply_pending_state)
         
         # Get assets directory path (support PyInstaller frozen bundle)
         if getattr(sys, "frozen", False):
@@ -58,18 +152,16 @@ class DashboardWindow(QWidget):
         self._assets_dir = base / "assets"
         
         self._init_ui()
+        # Bake the remaining state icons once the event loop is idle, so later state changes never load files
+        QTimer.singleShot(0, self._prebuild_icons)
     
     def _init_ui(self):
         """Initialize UI components."""
         self.setFixedSize(WINDOW_WIDTH, WINDOW_HEIGHT)
         # Set window flags for frameless window
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint)
-        # Dark grey background for the window
-        self.setStyleSheet(f"""
-            QWidget {{
-                background-color: {COLOR_BACKGROUND_DARK};
-            }}
-        """)
+        # Whole-window stylesheet (see _DASHBOARD_QSS); state changes flip properties, not sheets
+        self.setStyleSheet(_DASHBOARD_QSS)
         
         # Main layout with dark background
         main_layout = QVBoxLayout()
@@ -79,12 +171,7 @@ class DashboardWindow(QWidget):
         
         # White card container with rounded corners
         card_container = QWidget()
-        card_container.setStyleSheet(f"""
-            QWidget {{
-                background-color: {COLOR_BACKGROUND};
-                border-radius: 25px;
-            }}
-        """)
+        card_container.setObjectName("cardContainer")
         card_layout = QVBoxLayout()
         card_layout.setContentsMargins(20, 20, 20, 20)
         card_layout.setSpacing(0)
@@ -99,16 +186,8 @@ class DashboardWindow(QWidget):
         top_bar.setContentsMargins(0, 0, 0, 20)
         
         logout_button = QPushButton()
+        logout_button.setObjectName("logoutButton")
         logout_button.setFixedSize(32, 32)
-        logout_button.setStyleSheet(f"""
-            QPushButton {{
-                background-color: transparent;
-                border: none;
-            }}
-            QPushButton:hover {{
-                background-color: transparent;
-            }}
-        """)
         logout_button.setIcon(self._create_icon("power", COLOR_TEXT_DARK, 20))
         logout_button.setIconSize(logout_button.size())
         logout_button.clicked.connect(self.logout_requested.emit)
@@ -132,21 +211,11 @@ class DashboardWindow(QWidget):
         loading_font = QFont()
         loading_font.setPointSize(12)
         self._loading_label.setFont(loading_font)
-        self._loading_label.setStyleSheet(f"color: {COLOR_TEXT_LIGHT};")
+        self._loading_label.setProperty("tone", "light")
         self._loading_progress = QProgressBar()
-        self._loading_progress.setRange(0, 0)  # Indeterminate
+        self._loading_progress.setObjectName("loadingProgress")
+        self._loading_progress.setRange(0, 1)  # Determinate (static) while hidden; set_actions_loading animates it
         self._loading_progress.setFixedHeight(6)
-        self._loading_progress.setStyleSheet(f"""
-            QProgressBar {{
-                border: none;
-                border-radius: 3px;
-                background: {COLOR_BORDER_LIGHT};
-            }}
-            QProgressBar::chunk {{
-                background: {COLOR_PRIMARY};
-                border-radius: 3px;
-            }}
-        """)
         loading_layout.addWidget(self._loading_label)
         loading_layout.addWidget(self._loading_progress)
         self._loading_widget.setLayout(loading_layout)
@@ -159,7 +228,7 @@ class DashboardWindow(QWidget):
         welcome_font = QFont()
         welcome_font.setPointSize(16)
         self.welcome_label.setFont(welcome_font)
-        self.welcome_label.setStyleSheet(f"color: {COLOR_TEXT_DARK};")
+        self.welcome_label.setProperty("tone", "dark")
         content_layout.addWidget(self.welcome_label)
         
         # User name label
@@ -169,7 +238,7 @@ class DashboardWindow(QWidget):
         user_font.setPointSize(24)
         user_font.setWeight(QFont.Weight.DemiBold)
         self.user_name_label.setFont(user_font)
-        self.user_name_label.setStyleSheet(f"color: {COLOR_TEXT_DARK};")
+        self.user_name_label.setProperty("tone", "dark")
         content_layout.addWidget(self.user_name_label)
         
         # Time display
@@ -179,7 +248,7 @@ class DashboardWindow(QWidget):
         time_font.setPointSize(56)
         time_font.setWeight(QFont.Weight.Bold)
         self.time_label.setFont(time_font)
-        self.time_label.setStyleSheet(f"color: {COLOR_TEXT_DARK};")
+        self.time_label.setProperty("tone", "dark")
         content_layout.addWidget(self.time_label)
         
         # Shift label (set via set_shift_info from staff/dashboard or login staff_settings)
@@ -188,7 +257,7 @@ class DashboardWindow(QWidget):
         shift_font = QFont()
         shift_font.setPointSize(12)
         self.shift_label.setFont(shift_font)
-        self.shift_label.setStyleSheet(f"color: {COLOR_TEXT_LIGHT};")
+        self.shift_label.setProperty("tone", "light")
         content_layout.addWidget(self.shift_label)
         
         # Status area
@@ -201,6 +270,7 @@ class DashboardWindow(QWidget):
         status_font.setPointSize(20)
         status_font.setWeight(QFont.Weight.DemiBold)
         self.status_label.setFont(status_font)
+        self.status_label.setProperty("tone", "dark")
         status_layout.addWidget(self.status_label)
         
         self.status_time_label = QLabel("")
@@ -208,7 +278,7 @@ class DashboardWindow(QWidget):
         status_time_font = QFont()
         status_time_font.setPointSize(14)
         self.status_time_label.setFont(status_time_font)
-        self.status_time_label.setStyleSheet(f"color: {COLOR_TEXT_LIGHT};")
+        self.status_time_label.setProperty("tone", "light")
         status_layout.addWidget(self.status_time_label)
         
         # Late badge
@@ -216,15 +286,8 @@ class DashboardWindow(QWidget):
         self.late_badge.setAlignment(Qt.AlignCenter)
         late_font = QFont()
         late_font.setPointSize(10)
+        self.late_badge.setObjectName("lateBadge")
         self.late_badge.setFont(late_font)
-        self.late_badge.setStyleSheet(f"""
-            QLabel {{
-                background-color: #f0f0f0;
-                color: {COLOR_TEXT_LIGHT};
-                border-radius: 12px;
-                padding: 4px 12px;
-            }}
-        """)
         self.late_badge.hide()
         status_layout.addWidget(self.late_badge)
         
@@ -243,12 +306,7 @@ class DashboardWindow(QWidget):
         # Check-in/Check-out button
         self.check_in_out_button = QPushButton()
         self.check_in_out_button.setFixedSize(120, 120)
-        self.check_in_out_button.setStyleSheet(f"""
-            QPushButton {{
-                border-radius: 60px;
-                border: none;
-            }}
-        """)
+        self.check_in_out_button.setIconSize(self.check_in_out_button.size())  # Fixed size: set once
         self.check_in_out_button.clicked.connect(self._on_check_in_out_clicked)
         self.check_in_out_button.setCursor(Qt.CursorShape.PointingHandCursor)
         
@@ -257,7 +315,7 @@ class DashboardWindow(QWidget):
         button_label_font = QFont()
         button_label_font.setPointSize(12)
         self.check_in_out_label.setFont(button_label_font)
-        self.check_in_out_label.setStyleSheet(f"color: {COLOR_TEXT_DARK};")
+        self.check_in_out_label.setProperty("tone", "dark")
         
         check_in_out_layout = QVBoxLayout()
         check_in_out_layout.setSpacing(8)
@@ -268,20 +326,14 @@ class DashboardWindow(QWidget):
         # Break button
         self.break_button = QPushButton()
         self.break_button.setFixedSize(120, 120)
-        self.break_button.setStyleSheet(f"""
-            QPushButton {{
-                border-radius: 60px;
-                border: 2px solid {COLOR_TEXT_LIGHT};
-                background-color: {COLOR_BACKGROUND};
-            }}
-        """)
+        self.break_button.setIconSize(self.break_button.size())
         self.break_button.clicked.connect(self._on_break_clicked)
         self.break_button.setCursor(Qt.CursorShape.PointingHandCursor)
         
         self.break_label = QLabel("Break")
         self.break_label.setAlignment(Qt.AlignCenter)
         self.break_label.setFont(button_label_font)
-        self.break_label.setStyleSheet(f"color: {COLOR_TEXT_DARK};")
+        self.break_label.setProperty("tone", "dark")
         
         break_layout = QVBoxLayout()
         break_layout.setSpacing(8)
@@ -298,6 +350,21 @@ class DashboardWindow(QWidget):
         # Set initial state
         self.update_state(AppState.LOGGED_OUT)
     
+    def showEvent(self, event: QShowEvent):
+        """Redraw the work time and resume the tick when the dashboard becomes visible."""
+        super().showEvent(event)
+        self._sync_timer()
+    
+    def hideEvent(self, event: QHideEvent):
+        """No ticking while hidden (login screen / hidden window)."""
+        super().hideEvent(event)
+        self._timer.stop()
+    
+    def set_minimized(self, minimized: bool):
+        """Pause the clock while the top-level window is minimized; redraw and resume on restore."""
+        self._minimized = minimized
+        self._sync_timer()
+    
     def mousePressEvent(self, event: QMouseEvent):
         """Handle mouse press for window dragging."""
         if event.button() == Qt.MouseButton.LeftButton:
@@ -323,53 +390,23 @@ class DashboardWindow(QWidget):
             return self._create_fallback_icon(icon_name, color, size)
         
         try:
-            # Read SVG file
-            with open(svg_path, 'r', encoding='utf-8') as f:
-                svg_content = f.read()
-            
-            # Replace colors with desired color
-            # Handle various color formats and patterns
-            import re
-            
-            # Replace currentColor
-            svg_content = svg_content.replace('currentColor', color)
-            
-            # Replace stroke colors (handle quotes and hex colors)
-            svg_content = re.sub(r'stroke="[^"]*"', f'stroke="{color}"', svg_content)
-            svg_content = re.sub(r"stroke='[^']*'", f"stroke='{color}'", svg_content)
-            
-            # Replace fill colors (handle quotes and hex colors)
-            svg_content = re.sub(r'fill="[^"]*"', f'fill="{color}"', svg_content)
-            svg_content = re.sub(r"fill='[^']*'", f"fill='{color}'", svg_content)
-            
-            # Also handle common hardcoded colors
-            svg_content = svg_content.replace('fill="white"', f'fill="{color}"')
-            svg_content = svg_content.replace("fill='white'", f"fill='{color}'")
-            svg_content = svg_content.replace('fill="#ffffff"', f'fill="{color}"')
-            svg_content = svg_content.replace('fill="#FFFFFF"', f'fill="{color}"')
-            svg_content = svg_content.replace('fill="black"', f'fill="{color}"')
-            svg_content = svg_content.replace("fill='black'", f"fill='{color}'")
-            svg_content = svg_content.replace('fill="#000000"', f'fill="{color}"')
-            svg_content = svg_content.replace('fill="#404040"', f'fill="{color}"')
-            
-            svg_content = svg_content.replace('stroke="white"', f'stroke="{color}"')
-            svg_content = svg_content.replace("stroke='white'", f"stroke='{color}'")
-            svg_content = svg_content.replace('stroke="#ffffff"', f'stroke="{color}"')
-            svg_content = svg_content.replace('stroke="black"', f'stroke="{color}"')
-            svg_content = svg_content.replace("stroke='black'", f"stroke='{color}'")
-            svg_content = svg_content.replace('stroke="#000000"', f'stroke="{color}"')
-            svg_content = svg_content.replace('stroke="#404040"', f'stroke="{color}"')
-            
-            # Create renderer
-            renderer = QSvgRenderer(svg_content.encode('utf-8'))
-            
-            # Create pixmap and render SVG
-            pixmap = QPixmap(size, size)
-            pixmap.fill(Qt.GlobalColor.transparent)
+            mask = self._svg_mask_cache.get((icon_name, size))
+            if mask is None:
+                # Parse and rasterize the SVG once per size, in whatever colors the file uses
+                renderer = QSvgRenderer(svg_path.read_bytes())
+                mask = QPixmap(size, size)
+                mask.fill(Qt.GlobalColor.transparent)
+                painter = QPainter(mask)
+                painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+                renderer.render(painter)
+                painter.end()
+                self._svg_mask_cache[(icon_name, size)] = mask
             
+            # Recolor: paint the color through the rendered alpha (no SVG text rewriting)
+            pixmap = QPixmap(mask)
             painter = QPainter(pixmap)
-            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-            renderer.render(painter)
+            painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceIn)
+            painter.fillRect(pixmap.rect(), _tint_color(color))
             painter.end()
             
             return QIcon(pixmap)
@@ -471,15 +508,12 @@ class DashboardWindow(QWidget):
             # Tint non-white pixels to the requested color (PNG is white-on-transparent)
             need_tint = color.lower() not in ("white", "#ffffff", "#fff")
             if need_tint:
-                qc = QColor(color)
-                if not qc.isValid():
-                    qc = QColor(COLOR_TEXT_DARK)
-                r, g, b = qc.red(), qc.green(), qc.blue()
-                for y in range(img.height()):
-                    for x in range(img.width()):
-                        p = img.pixelColor(x, y)
-                        if p.alpha() > 10:
-                            img.setPixelColor(x, y, QColor(r, g, b, p.alpha()))
+                qc = _tint_color(color)
+                # Fill through the image's own alpha: one raster op instead of a Python loop over every pixel
+                painter = QPainter(img)
+                painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceIn)
+                painter.fillRect(img.rect(), qc)
+                painter.end()
 
             return QIcon(QPixmap.fromImage(img))
         except Exception as e:
@@ -487,42 +521,86 @@ class DashboardWindow(QWidget):
             return self._load_svg_icon(icon_name, color, size)
 
     def _create_icon(self, icon_type: str, color: str, size: int = 32) -> QIcon:
-        """Create icon - PNG for arrow_left/arrow_right, else SVG, then programmatic fallback."""
+        """Create icon - PNG for arrow_left/arrow_right, else SVG, then programmatic fallback (cached per type/color/size)."""
+        key = (icon_type, color, size)
+        icon = self._icon_cache.get(key)
+        if icon is not None:
+            return icon
         if icon_type in ("arrow_left", "arrow_right"):
             png_path = self._assets_dir / f"{icon_type}.png"
             if png_path.exists():
-                return self._load_png_icon(icon_type, color, size)
-        return self._load_svg_icon(icon_type, color, size)
+                icon = self._load_png_icon(icon_type, color, size)
+        if icon is None:
+            icon = self._load_svg_icon(icon_type, color, size)
+        self._icon_cache[key] = icon
+        return icon
+    
+    def _prebuild_icons(self):
+        """Fill the icon cache with every icon update_state can ask for."""
+        for key in _DASHBOARD_ICON_KEYS:
+            self._create_icon(*key)
+    
+    @classmethod
+    def clear_icon_cache(cls):
+        """Drop cached icons (call after changing theme colors; SVG renders are color-independent and kept)."""
+        cls._icon_cache.clear()
     
     def _update_time(self):
         """Show work time = (check_in to now or break_start) minus all break durations (HH:MM:SS)."""
+        if self._minimized or not self.isVisible():
+            return  # Nothing on screen to update; showEvent / set_minimized(False) redraw
         try:
             if self._check_in_timestamp is None:
-                self.time_label.setText("00:00:00")
+                self._set_time_text("00:00:00")
                 return
             
-            now = datetime.now()
             if self._break_start_timestamp is not None:
-                end_dt = self._break_start_timestamp  # Frozen on break
+                # Frozen on break: only drawn when something changes (the tick is stopped)
+                end_dt = self._break_start_timestamp
+                elapsed_seconds = (end_dt - self._check_in_timestamp).total_seconds()
+                break_seconds = self._total_break_seconds(end_dt)
             else:
-                end_dt = now
-            
-            elapsed_seconds = (end_dt - self._check_in_timestamp).total_seconds()
-            break_seconds = self._total_break_seconds(end_dt)
+                # Running: wall-clock epoch seconds (not monotonic, which pauses while the machine sleeps)
+                now = time.time()
+                elapsed_seconds = now - self._check_in_epoch
+                break_seconds = self._running_break_seconds(now)
             work_seconds = max(0, int(elapsed_seconds - break_seconds))
             
-            hours = work_seconds // 3600
-            minutes = (work_seconds % 3600) // 60
-            seconds = work_seconds % 60
-            self.time_label.setText(f"{hours:02d}:{minutes:02d}:{seconds:02d}")
+            minutes, seconds = divmod(work_seconds, 60)
+            hours, minutes = divmod(minutes, 60)
+            self._set_time_text(f"{hours:02d}:{minutes:02d}:{seconds:02d}")
         except Exception as e:
             print(f"Timer error: {e}")
-            self.time_label.setText("00:00:00")
+            self._set_time_text("00:00:00")
+    
+    def _set_time_text(self, text: str):
+        """Set time_label text unless it already shows it."""
+        if text != self._last_time_text:
+            self._last_time_text = text
+            self.time_label.setText(text)
+    
+    def _sync_timer(self):
+        """Redraw the work time now; run the 1 s tick only while it can change (checked in, not frozen, on screen)."""
+        self._update_time()
+        ticking = (self._check_in_timestamp is not None and self._break_start_timestamp is None
+                   and self.isVisible() and not self._minimized)
+        if ticking:
+            if not self._timer.isActive():
+                self._timer.start()
+        else:
+            self._timer.stop()
     
     def _total_break_seconds(self, as_of_dt: datetime) -> float:
         """Total break duration in seconds up to as_of_dt. Uses today_attendance breaks (start_time, end_time)."""
         if not self._today_attendance_breaks:
             return 0.0
+        if self._closed_breaks_end is None or self._closed_breaks_end <= as_of_dt:
+            # Usual case: every closed break ended by as_of_dt, only open breaks still grow
+            total = self._closed_break_seconds
+            for start_dt in self._open_break_starts:
+                if start_dt < as_of_dt:
+                    total += (as_of_dt - start_dt).total_seconds()
+            return total
         total = 0.0
         for start_dt, end_dt in self._today_attendance_breaks:
             if end_dt is not None:
@@ -534,10 +612,23 @@ class DashboardWindow(QWidget):
                     total += (as_of_dt - start_dt).total_seconds()
         return total
     
+    def _running_break_seconds(self, now_epoch: float) -> float:
+        """_total_break_seconds as of now, from the epoch-second summaries (no datetime arithmetic)."""
+        if not self._today_attendance_breaks:
+            return 0.0
+        if self._closed_breaks_end_epoch is not None and self._closed_breaks_end_epoch > now_epoch:
+            return self._total_break_seconds(datetime.fromtimestamp(now_epoch))
+        total = self._closed_break_seconds
+        for start_epoch in self._open_break_start_epochs:
+            if start_epoch < now_epoch:
+                total += now_epoch - start_epoch
+        return total
+    
     def set_today_attendance(self, today_attendance: dict):
         """Set today_attendance from API; parse breaks into (start_dt, end_dt) for work time calculation."""
         self._today_attendance_breaks = None
         if not today_attendance:
+            self._sync_timer()
             return
         breaks_raw = today_attendance.get("breaks") or []
         parsed = []
@@ -562,6 +653,13 @@ class DashboardWindow(QWidget):
                     pass
             parsed.append((start_dt, end_dt))
         self._today_attendance_breaks = parsed
+        closed = [(start_dt, end_dt) for start_dt, end_dt in parsed if end_dt is not None]
+        self._closed_break_seconds = sum(((end_dt - start_dt).total_seconds() for start_dt, end_dt in closed), 0.0)
+        self._closed_breaks_end = max((end_dt for _, end_dt in closed), default=None)
+        self._open_break_starts = tuple(start_dt for start_dt, end_dt in parsed if end_dt is None)
+        self._closed_breaks_end_epoch = self._closed_breaks_end.timestamp() if self._closed_breaks_end else None
+        self._open_break_start_epochs = tuple(start_dt.timestamp() for start_dt in self._open_break_starts)
+        self._sync_timer()
     
     def set_check_in_time(self, check_in_time_str: str = None, check_in_timestamp: datetime = None,
                           break_start_timestamp: datetime = None):
@@ -581,24 +679,38 @@ class DashboardWindow(QWidget):
             except Exception:
                 self._check_in_timestamp = datetime.now()
         # if both None: keep existing _check_in_timestamp (e.g. when only clearing break)
+        self._check_in_epoch = self._check_in_timestamp.timestamp() if self._check_in_timestamp is not None else None
         
         self._break_start_timestamp = _to_local_naive(break_start_timestamp) if break_start_timestamp is not None else None
+        self._sync_timer()
     
     def set_break_freeze(self, break_start_timestamp: datetime):
         """Freeze timer when user goes on break. Display = (break_start - check_in)."""
         self._break_start_timestamp = break_start_timestamp
+        self._sync_timer()
     
     def clear_break_freeze(self):
         """Resume timer when user ends break. Display = (now - check_in)."""
         self._break_start_timestamp = None
+        self._sync_timer()
     
     def reset_timer(self):
         """Reset the timer (when checking out or logging out). Shows 00:00:00."""
         self._check_in_timestamp = None
+        self._check_in_epoch = None
         self._break_start_timestamp = None
+        self._sync_timer()
     
     def set_actions_loading(self, loading: bool):
         """Disable action buttons, show loader and wait cursor while an API call is in progress."""
+        self._actions_loading = loading
+        self._last_update_args = None  # Enabled flags changed here: next update_state must re-render
+        # Indeterminate range only while shown: some styles keep the busy animation running when hidden
+        if loading:
+            self._loading_progress.setRange(0, 0)
+        else:
+            self._loading_progress.setRange(0, 1)
+            self._loading_progress.setValue(0)
         self._loading_widget.setVisible(loading)
         self.check_in_out_button.setEnabled(not loading)
         self.break_button.setEnabled(not loading)
@@ -627,16 +739,57 @@ class DashboardWindow(QWidget):
 
     def update_state(self, state: AppState, check_in_time: str = None, 
                     break_start_time: str = None, late_by_minutes: int = None):
-        """Update UI based on state."""
-        # Only reset timer when logging out or checking out
+        """Update UI based on state. Timer changes apply now; widgets render once per burst of calls."""
+        # Timer side effects always apply immediately
         if state == AppState.LOGGED_OUT:
+            # Only reset timer when logging out or checking out
             self.reset_timer()
+        elif state == AppState.CHECKED_IN:
+            # Resume timer when coming back from break
+            self.clear_break_freeze()
+            # Mark that user has checked in (so we can show "Checked Out" when they check out)
+            self._was_checked_in = True
+        self._bind_actions(state)  # A click before the deferred render must already send the new request
+        
+        self._pending_state_args = (state, check_in_time, break_start_time, late_by_minutes)
+        if self.isVisible():
+            self._pending_state_timer.start()  # (Re)start: only the last call of a burst renders
+        else:
+            self._apply_pending_state()  # Nothing on screen to coalesce for; keep hidden updates synchronous
+    
+    def _bind_actions(self, state: AppState):
+        """Point the action buttons at the requests they send in this state."""
+        if state == AppState.LOGGED_OUT:
+            self._check_action = self.check_in_requested.emit
+            self._break_action = self.start_break_requested.emit
+        elif state == AppState.CHECKED_IN:
+            self._check_action = self.check_out_requested.emit
+            self._break_action = self.start_break_requested.emit
+        elif state == AppState.ON_BREAK or state == AppState.FORCE_BREAK:
+            self._check_action = self.check_out_requested.emit
+            self._break_action = self.end_break_requested.emit
+    
+    def _apply_pending_state(self):
+        """Render the latest update_state arguments."""
+        self._pending_state_timer.stop()
+        args = self._pending_state_args
+        if args is None:
+            return
+        self._pending_state_args = None
+        self._render_state(*args)
+    
+    def _render_state(self, state: AppState, check_in_time: str, break_start_time: str, late_by_minutes: int):
+        """Apply state to the widgets (only touched when the arguments changed)."""
+        args = (state, check_in_time, break_start_time, late_by_minutes, self._was_checked_in)
+        if args == self._last_update_args:
+            return
+        self._last_update_args = args
         
         if state == AppState.LOGGED_OUT:
             # Show "Checked Out" if user was previously checked in, otherwise show nothing
             if self._was_checked_in:
                 self.status_label.setText("Checked Out")
-                self.status_label.setStyleSheet(f"color: {COLOR_TEXT_DARK};")
+                self._set_style_property(self.status_label, "tone", "dark")
                 self.status_label.show()
                 self.status_time_label.hide()
                 self.late_badge.hide()
@@ -649,38 +802,18 @@ class DashboardWindow(QWidget):
                 self.late_badge.hide()
             
             # Check-in button active
-            self.check_in_out_button.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: {COLOR_PRIMARY};
-                    border: none;
-                    border-radius: 60px;
-                }}
-            """)
-            self.check_in_out_button.setIcon(self._create_icon("arrow_right", "white", 60))
-            self.check_in_out_button.setIconSize(self.check_in_out_button.size())
+            self._apply_button_look("check_in_out", self.check_in_out_button, "primary", ("arrow_right", "white", 60))
             self.check_in_out_label.setText("Check-in")
             self.check_in_out_button.setEnabled(True)
             
             # Break button inactive (label "Break" for both neutral and checked out)
             self.break_label.setText("Break")
-            self.break_button.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: {COLOR_BACKGROUND};
-                    border: 2px solid {COLOR_BORDER_LIGHT};
-                    border-radius: 60px;
-                }}
-            """)
-            self.break_button.setIcon(self._create_icon("pause", COLOR_TEXT_DARK, 60))
-            self.break_button.setIconSize(self.break_button.size())
+            self._apply_button_look("break", self.break_button, "inactive", ("pause", COLOR_TEXT_DARK, 60))
             self.break_button.setEnabled(False)
             
         elif state == AppState.CHECKED_IN:
-            # Resume timer when coming back from break
-            self.clear_break_freeze()
-            # Mark that user has checked in (so we can show "Checked Out" when they check out)
-            self._was_checked_in = True
             self.status_label.setText("Checked In")
-            self.status_label.setStyleSheet(f"color: {COLOR_SUCCESS};")
+            self._set_style_property(self.status_label, "tone", "success")
             self.status_label.show()
             
             if check_in_time:
@@ -691,49 +824,24 @@ class DashboardWindow(QWidget):
             
             if late_by_minutes and late_by_minutes > 0:
                 self.late_badge.setText(f"Late by: {late_by_minutes} min")
-                self.late_badge.setStyleSheet(f"""
-                    QLabel {{
-                        background-color: #f0f0f0;
-                        color: {COLOR_TEXT_LIGHT};
-                        border: 1px solid {COLOR_BORDER_LIGHT};
-                        border-radius: 12px;
-                        padding: 4px 12px;
-                    }}
-                """)
                 self.late_badge.show()
             else:
                 self.late_badge.hide()
             
             # Check-out button active
-            self.check_in_out_button.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: {COLOR_PRIMARY};
-                    border: none;
-                    border-radius: 60px;
-                }}
-            """)
-            self.check_in_out_button.setIcon(self._create_icon("arrow_left", "white", 60))
-            self.check_in_out_button.setIconSize(self.check_in_out_button.size())
+            self._apply_button_look("check_in_out", self.check_in_out_button, "primary", ("arrow_left", "white", 60))
             self.check_in_out_label.setText("Check-out")
             self.check_in_out_button.setEnabled(True)
             
             # Start Break button active
-            self.break_button.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: {COLOR_PRIMARY};
-                    border: none;
-                    border-radius: 60px;
-                }}
-            """)
-            self.break_button.setIcon(self._create_icon("pause", "white", 60))
-            self.break_button.setIconSize(self.break_button.size())
+            self._apply_button_look("break", self.break_button, "primary", ("pause", "white", 60))
             self.break_label.setText("Start Break")
             self.break_button.setEnabled(True)
             
         elif state == AppState.ON_BREAK or state == AppState.FORCE_BREAK:
             status_text = "Force Break" if state == AppState.FORCE_BREAK else "On Break"
             self.status_label.setText(status_text)
-            self.status_label.setStyleSheet(f"color: {COLOR_ALERT};")
+            self._set_style_property(self.status_label, "tone", "alert")
             self.status_label.show()
             
             if break_start_time:
@@ -745,42 +853,41 @@ class DashboardWindow(QWidget):
             self.late_badge.hide()
             
             # Check-out button inactive
-            self.check_in_out_button.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: {COLOR_BACKGROUND};
-                    border: 2px solid {COLOR_BORDER_LIGHT};
-                    border-radius: 60px;
-                }}
-            """)
-            self.check_in_out_button.setIcon(self._create_icon("arrow_left", COLOR_TEXT_DARK, 60))
-            self.check_in_out_button.setIconSize(self.check_in_out_button.size())
+            self._apply_button_look("check_in_out", self.check_in_out_button, "inactive", ("arrow_left", COLOR_TEXT_DARK, 60))
             self.check_in_out_label.setText("Check-out")
             self.check_in_out_button.setEnabled(False)
             
             # End Break button active (red)
-            self.break_button.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: {COLOR_ALERT};
-                    border: none;
-                    border-radius: 60px;
-                }}
-            """)
-            self.break_button.setIcon(self._create_icon("play", "white", 60))
-            self.break_button.setIconSize(self.break_button.size())
+            self._apply_button_look("break", self.break_button, "alert", ("play", "white", 60))
             self.break_label.setText("End Break")
             self.break_button.setEnabled(True)
         
+        if self._actions_loading:
+            # Rendered while an API call is running (deferred render): keep the actions disabled
+            self.check_in_out_button.setEnabled(False)
+            self.break_button.setEnabled(False)
+    
+    def _apply_button_look(self, name: str, button: QPushButton, look: str, icon_key: Tuple[str, str, int]):
+        """Set an action button's look (stylesheet property) and icon, skipping whichever is already applied."""
+        self._set_style_property(button, "look", look)
+        if icon_key != self._button_icon_keys.get(name):
+            button.setIcon(self._create_icon(*icon_key))
+            self._button_icon_keys[name] = icon_key
+    
+    @staticmethod
+    def _set_style_property(widget: QWidget, name: str, value: str):
+        """Set a dynamic property matched by the window stylesheet, re-polishing only when it changed."""
+        if widget.property(name) == value:
+            return
+        widget.setProperty(name, value)
+        style = widget.style()
+        style.unpolish(widget)
+        style.polish(widget)
     
     def _on_check_in_out_clicked(self):
         """Handle check-in/check-out button click."""
-        if self.check_in_out_label.text() == "Check-in":
-            self.check_in_requested.emit()
-        else:
-            self.check_out_requested.emit()
+        self._check_action()
     
     def _on_break_clicked(self):
         """Handle break button click."""
-        if self.break_label.text() in ["Break", "Start Break"]:
-            self.start_break_requested.emit()
-        else:
-            self.end_break_requested.emit()
+        self._break_action()
@@ -1,6 +1,7 @@
 """
 Login window UI matching the provided design.
 """
+from typing import Dict, Optional
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, 
     QPushButton, QCheckBox, QFrame, QProgressBar
@@ -18,11 +19,24 @@ class LoginWindow(QWidget):
     """Login window matching the design."""
     
     login_requested = Signal(str, str, bool)  # email, password, remember_me
-    
+
+    _font_cache: Dict[int, QFont] = {}  # point size -> font, shared by all instances
+
     def __init__(self):
         super().__init__()
         self._drag_position = QPoint()
+        self._loading_widget: Optional[QWidget] = None  # Built on the first set_loading(True)
         self._init_ui()
+
+    @classmethod
+    def _font(cls, point_size: int) -> QFont:
+        """Return the shared font of the given point size (built on first use, after QApplication exists)."""
+        font = cls._font_cache.get(point_size)
+        if font is None:
+            font = QFont()
+            font.setPointSize(point_size)
+            cls._font_cache[point_size] = font
+        return font
     
     def _init_ui(self):
         """Initialize UI components."""
@@ -66,17 +80,12 @@ class LoginWindow(QWidget):
         
         welcome_label = QLabel("Welcome")
         welcome_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        welcome_font = QFont()
-        welcome_font.setPointSize(18)
-        welcome_font.setWeight(QFont.Weight.Normal)
-        welcome_label.setFont(welcome_font)
+        welcome_label.setFont(self._font(18))  # Default weight (Normal)
         welcome_label.setStyleSheet(f"color: {COLOR_TEXT_DARK};")
         
         subtitle_label = QLabel("Login to your account")
         subtitle_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        subtitle_font = QFont()
-        subtitle_font.setPointSize(14)
-        subtitle_label.setFont(subtitle_font)
+        subtitle_label.setFont(self._font(14))
         subtitle_label.setStyleSheet(f"color: {COLOR_TEXT_LIGHT};")
         
         header_layout.addWidget(welcome_label)
@@ -107,9 +116,7 @@ class LoginWindow(QWidget):
         email_layout.setContentsMargins(0, 0, 0, 0)
         
         email_label = QLabel("Enter Your Email")
-        email_label_font = QFont()
-        email_label_font.setPointSize(12)
-        email_label.setFont(email_label_font)
+        email_label.setFont(self._font(12))
         email_label.setStyleSheet(f"color: {COLOR_TEXT_DARK}; margin: 0; padding: 0;")
         email_label.setContentsMargins(0, 0, 0, 0)
         
@@ -143,9 +150,7 @@ class LoginWindow(QWidget):
         password_layout.setContentsMargins(0, 0, 0, 0)
         
         password_label = QLabel("Enter Your Password")
-        password_label_font = QFont()
-        password_label_font.setPointSize(12)
-        password_label.setFont(password_label_font)
+        password_label.setFont(self._font(12))
         password_label.setStyleSheet(f"color: {COLOR_TEXT_DARK}; margin: 0; padding: 0;")
         password_label.setContentsMargins(0, 0, 0, 0)
         
@@ -209,9 +214,7 @@ class LoginWindow(QWidget):
         options_layout.setContentsMargins(0, 0, 0, 0)
         
         self.remember_checkbox = QCheckBox("Remember Me")
-        remember_font = QFont()
-        remember_font.setPointSize(10)
-        self.remember_checkbox.setFont(remember_font)
+        self.remember_checkbox.setFont(self._font(10))
         self.remember_checkbox.setStyleSheet(f"""
             QCheckBox {{
                 color: {COLOR_TEXT_DARK};
@@ -230,9 +233,7 @@ class LoginWindow(QWidget):
         """)
         
         recover_button = QPushButton("Recover Password")
-        recover_font = QFont()
-        recover_font.setPointSize(10)
-        recover_button.setFont(recover_font)
+        recover_button.setFont(self._font(10))
         recover_button.setStyleSheet(f"""
             QPushButton {{
                 color: {COLOR_PRIMARY};
@@ -254,44 +255,10 @@ class LoginWindow(QWidget):
         options_widget.setMinimumWidth(280)
         self.card_layout.addWidget(options_widget, 0, Qt.AlignmentFlag.AlignHCenter)
 
-        # Loading indicator (hidden by default)
-        self._loading_widget = QWidget()
-        self._loading_widget.setMinimumWidth(280)
-        loading_layout = QVBoxLayout()
-        loading_layout.setSpacing(0)
-        loading_layout.setContentsMargins(0, 0, 0, 0)
-        self._loading_label = QLabel("Signing in...")
-        self._loading_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        loading_font = QFont()
-        loading_font.setPointSize(12)
-        self._loading_label.setFont(loading_font)
-        self._loading_label.setStyleSheet(f"color: {COLOR_TEXT_DARK};")
-        self._loading_progress = QProgressBar()
-        self._loading_progress.setRange(0, 0)  # Indeterminate
-        self._loading_progress.setFixedHeight(6)
-        self._loading_progress.setStyleSheet(f"""
-            QProgressBar {{
-                border: none;
-                border-radius: 3px;
-                background: {COLOR_BORDER_LIGHT};
-            }}
-            QProgressBar::chunk {{
-                background: {COLOR_PRIMARY};
-                border-radius: 3px;
-            }}
-        """)
-        loading_layout.addWidget(self._loading_label)
-        loading_layout.addWidget(self._loading_progress)
-        self._loading_widget.setLayout(loading_layout)
-        self._loading_widget.hide()
-        self.card_layout.addWidget(self._loading_widget, 0, Qt.AlignmentFlag.AlignHCenter)
-        
         # Login button
         self.login_button = QPushButton("Login")
         self.login_button.setMinimumWidth(280)
-        login_font = QFont()
-        login_font.setPointSize(14)
-        self.login_button.setFont(login_font)
+        self.login_button.setFont(self._font(14))
         self.login_button.setFixedHeight(50)
         self.login_button.setStyleSheet(f"""
             QPushButton {{
@@ -315,6 +282,42 @@ class LoginWindow(QWidget):
         self.password_input.returnPressed.connect(self._on_login_clicked)
         
         self.card_layout.addWidget(self.login_button, 0, Qt.AlignmentFlag.AlignHCenter)
+
+    def _ensure_loading_widget(self) -> QWidget:
+        """Build the 'Signing in...' indicator on first use and slot it in above the login button."""
+        if self._loading_widget is not None:
+            return self._loading_widget
+        loading_widget = QWidget()
+        loading_widget.setMinimumWidth(280)
+        loading_layout = QVBoxLayout()
+        loading_layout.setSpacing(0)
+        loading_layout.setContentsMargins(0, 0, 0, 0)
+        self._loading_label = QLabel("Signing in...")
+        self._loading_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self._loading_label.setFont(self._font(12))
+        self._loading_label.setStyleSheet(f"color: {COLOR_TEXT_DARK};")
+        self._loading_progress = QProgressBar()
+        self._loading_progress.setRange(0, 1)  # Determinate (static) while hidden; set_loading animates it
+        self._loading_progress.setFixedHeight(6)
+        self._loading_progress.setStyleSheet(f"""
+            QProgressBar {{
+                border: none;
+                border-radius: 3px;
+                background: {COLOR_BORDER_LIGHT};
+            }}
+            QProgressBar::chunk {{
+                background: {COLOR_PRIMARY};
+                border-radius: 3px;
+            }}
+        """)
+        loading_layout.addWidget(self._loading_label)
+        loading_layout.addWidget(self._loading_progress)
+        loading_widget.setLayout(loading_layout)
+        loading_widget.hide()
+        self.card_layout.insertWidget(self.card_layout.indexOf(self.login_button), loading_widget,
+                                      0, Qt.AlignmentFlag.AlignHCenter)
+        self._loading_widget = loading_widget
+        return loading_widget
     
     def mousePressEvent(self, event: QMouseEvent):
         """Handle mouse press for window dragging."""
@@ -355,11 +358,17 @@ class LoginWindow(QWidget):
         self.password_input.setEnabled(not loading)
         self._password_toggle_btn.setEnabled(not loading)
         self.login_button.setEnabled(not loading)
-        self._loading_widget.setVisible(loading)
         if loading:
+            self._ensure_loading_widget()
+            self._loading_progress.setRange(0, 0)  # Indeterminate only while visible: no busy-animation timer otherwise
+            self._loading_widget.show()
             self.login_button.setText("Signing in...")
             self.login_button.setCursor(Qt.CursorShape.WaitCursor)
         else:
+            if self._loading_widget is not None:
+                self._loading_widget.hide()
+                self._loading_progress.setRange(0, 1)
+                self._loading_progress.setValue(0)
             self.login_button.setText("Login")
             self.login_button.setCursor(Qt.CursorShape.PointingHandCursor)
     
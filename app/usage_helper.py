@@ -2,9 +2,14 @@
 Platform-specific helpers to get active application name and (for browsers) current site URL.
 Used when usage_policy_enabled to report app/website usage to POST /desktop/usage/report.
 """
+import ntpath
+import os
+import select
+import signal
 import sys
-import subprocess
-from typing import Tuple, Optional
+import time
+from collections import OrderedDict
+from typing import Callable, Tuple, Optional
 
 
 # Known browser bundle names (macOS) / process names (Windows) so we can try to get URL
@@ -23,78 +28,181 @@ def get_active_app_and_url() -> Tuple[Optional[str], Optional[str]]:
     return (None, None)
 
 
+# Active tab URL per browser (Chromium is driven through Chrome's dictionary). Firefox's AppleScript
+# support is limited, so it is reported without a URL.
+_BROWSER_URL_SCRIPTS = {
+    "Google Chrome": 'tell application "Google Chrome" to get URL of active tab of front window',
+    "Chromium": 'tell application "Google Chrome" to get URL of active tab of front window',
+    "Microsoft Edge": 'tell application "Microsoft Edge" to get URL of active tab of front window',
+    "Safari": 'tell application "Safari" to get URL of current tab of front window',
+    "Brave Browser": 'tell application "Brave Browser" to get URL of active tab of front window',
+}
+
+
+def _build_frontmost_script() -> str:
+    """One AppleScript that returns "<frontmost app>\n<active tab URL or empty>".
+
+    Each browser's URL query goes through `run script` so it is only compiled when that browser is
+    frontmost (a literal `tell application` to an app that isn't installed would fail to compile).
+    """
+    lines = [
+        'tell application "System Events" to set appName to name of first process whose frontmost is true',
+        'set pageURL to ""',
+        "try",
+    ]
+    for i, (app_name, url_script) in enumerate(_BROWSER_URL_SCRIPTS.items()):
+        keyword = "if" if i == 0 else "else if"
+        escaped = url_script.replace('"', '\\"')
+        lines.append(f'    {keyword} appName is "{app_name}" then')
+        lines.append(f'        set pageURL to (run script "{escaped}") as text')
+    lines += ["    end if", "end try", "return appName & linefeed & pageURL"]
+    return "\n".join(lines)
+
+
+_FRONTMOST_SCRIPT = _build_frontmost_script()
+_OSASCRIPT = "/usr/bin/osascript"
+_OSASCRIPT_TIMEOUT_SECONDS = 2.0
+
+
+def _run_osascript(script: str) -> Optional[str]:
+    """Run script with osascript via posix_spawn and a bare pipe; its stdout, or None on failure or timeout."""
+    read_fd, write_fd = os.pipe()
+    try:
+        pid = os.posix_spawn(_OSASCRIPT, ["osascript", "-e", script], os.environ, file_actions=[
+            (os.POSIX_SPAWN_DUP2, write_fd, 1),
+            (os.POSIX_SPAWN_OPEN, 2, os.devnull, os.O_WRONLY, 0),  # Script errors are reported as None, not printed
+            (os.POSIX_SPAWN_CLOSE, read_fd),
+        ])
+    except OSError:
+        os.close(read_fd)
+        os.close(write_fd)
+        return None
+    os.close(write_fd)  # Child holds the only write end: EOF on read_fd means it exited
+    chunks = []
+    deadline = time.monotonic() + _OSASCRIPT_TIMEOUT_SECONDS
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([read_fd], [], [], remaining)[0]:
+                os.kill(pid, signal.SIGKILL)  # Hung (e.g. waiting on an Automation prompt)
+                os.waitpid(pid, 0)
+                return None
+            data = os.read(read_fd, 4096)
+            if not data:
+                break
+            chunks.append(data)
+    finally:
+        os.close(read_fd)
+    _, status = os.waitpid(pid, 0)
+    if os.waitstatus_to_exitcode(status) != 0:
+        return None
+    return b"".join(chunks).decode("utf-8", "replace")
+
+
 def _get_active_app_and_url_macos() -> Tuple[Optional[str], Optional[str]]:
+    """Frontmost app and (for browsers) active tab URL in a single osascript run."""
     try:
-        out = subprocess.run(
-            ["osascript", "-e", 'tell application "System Events" to get name of first process whose frontmost is true'],
-            capture_output=True, text=True, timeout=2
-        )
-        if out.returncode != 0 or not out.stdout:
+        out = _run_osascript(_FRONTMOST_SCRIPT)
+        if not out:
             return (None, None)
-        app_name = out.stdout.strip()
+        app_name, _, site_url = out.rstrip("\n").partition("\n")
+        app_name = app_name.strip()
         if not app_name:
             return (None, None)
-        site_url = None
-        if app_name in BROWSER_APPS:
-            site_url = _get_browser_url_macos(app_name)
+        site_url = site_url.strip()
+        if not site_url or site_url == "missing value":
+            site_url = None
         return (app_name, site_url)
     except Exception:
         return (None, None)
 
 
-def _get_browser_url_macos(app_name: str) -> Optional[str]:
-    """Get active tab URL for Chrome/Safari/Edge on macOS via AppleScript."""
-    script = None
-    if app_name == "Google Chrome" or app_name == "Chromium":
-        script = 'tell application "Google Chrome" to get URL of active tab of front window'
-    elif app_name == "Microsoft Edge":
-        script = 'tell application "Microsoft Edge" to get URL of active tab of front window'
-    elif app_name == "Safari":
-        script = 'tell application "Safari" to get URL of current tab of front window'
-    elif app_name == "Brave Browser":
-        script = 'tell application "Brave Browser" to get URL of active tab of front window'
-    elif app_name == "Firefox":
-        # Firefox AppleScript support is limited; skip URL
-        return None
-    if not script:
-        return None
-    try:
-        out = subprocess.run(["osascript", "-e", script], capture_output=True, text=True, timeout=2)
-        if out.returncode == 0 and out.stdout and out.stdout.strip():
-            url = out.stdout.strip()
-            if url and url != "missing value":
-                return url
-    except Exception:
-        pass
-    return None
+_FOREGROUND_CACHE_SIZE = 32  # Distinct foreground windows remembered (hwnd -> app name)
+_PROCESS_QUERY_LIMITED_INFORMATION = 0x1000  # Enough for QueryFullProcessImageNameW, even on elevated processes
 
 
-def _get_active_app_and_url_windows() -> Tuple[Optional[str], Optional[str]]:
-    """Get foreground window process name on Windows. Browser URL not implemented (would need UIA/accessibility)."""
+def _load_windows_foreground_fn() -> Optional[Callable[[], Optional[str]]]:
+    """Resolve the Win32 foreground-app-name lookup once at import. None if not available."""
+    if sys.platform != "win32":
+        return None
     try:
         import ctypes
         from ctypes import wintypes
         user32 = ctypes.windll.user32
         kernel32 = ctypes.windll.kernel32
+        get_foreground_window = user32.GetForegroundWindow
+        get_foreground_window.restype = wintypes.HWND
+        get_window_thread_process_id = user32.GetWindowThreadProcessId
+        get_window_thread_process_id.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.DWORD)]
+        get_window_thread_process_id.restype = wintypes.DWORD
+        open_process = kernel32.OpenProcess
+        open_process.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+        open_process.restype = wintypes.HANDLE
+        query_image_name = kernel32.QueryFullProcessImageNameW
+        query_image_name.argtypes = [wintypes.HANDLE, wintypes.DWORD, wintypes.LPWSTR, ctypes.POINTER(wintypes.DWORD)]
+        query_image_name.restype = wintypes.BOOL
+        close_handle = kernel32.CloseHandle
+        close_handle.argtypes = [wintypes.HANDLE]
+        # Reused for every call (samples run one at a time); only the OS writes into them
         pid = wintypes.DWORD()
-        hwnd = user32.GetForegroundWindow()
-        if not hwnd:
-            return (None, None)
-        user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
-        try:
-            import psutil
-            proc = psutil.Process(pid.value)
-            name = proc.name()
-            if name:
-                # .exe strip
-                if name.lower().endswith(".exe"):
-                    name = name[:-4]
-                site_url = None
-                if any(b in name for b in ("chrome", "msedge", "firefox", "safari", "brave")):
-                    site_url = None  # Windows: would need UIA to get URL
-                return (name, site_url)
-        except Exception:
-            pass
+        pid_ref = ctypes.byref(pid)
+        path_buf = ctypes.create_unicode_buffer(1024)
+        path_len = wintypes.DWORD()
+        path_len_ref = ctypes.byref(path_len)
+        # hwnd -> (pid, app name), most recent last: steady-state samples skip OpenProcess entirely
+        name_cache: "OrderedDict[int, Tuple[int, str]]" = OrderedDict()
+        last = [0, 0, ""]  # hwnd, pid, name of the previous sample: same window = no cache bookkeeping at all
+
+        def _foreground_app_name() -> Optional[str]:
+            hwnd = get_foreground_window()
+            if not hwnd:
+                return None
+            get_window_thread_process_id(hwnd, pid_ref)
+            if not pid.value:
+                return None
+            if hwnd == last[0] and pid.value == last[1]:
+                return last[2]
+            cached = name_cache.get(hwnd)
+            if cached is not None and cached[0] == pid.value:  # pid check: hwnd values get reused
+                name_cache.move_to_end(hwnd)
+                last[:] = hwnd, pid.value, cached[1]
+                return cached[1]
+            handle = open_process(_PROCESS_QUERY_LIMITED_INFORMATION, False, pid.value)
+            if not handle:
+                return None
+            try:
+                path_len.value = len(path_buf)
+                if not query_image_name(handle, 0, path_buf, path_len_ref):
+                    return None
+                name = ntpath.basename(path_buf.value)
+            finally:
+                close_handle(handle)
+            if name.lower().endswith(".exe"):
+                name = name[:-4]
+            if not name:
+                return None
+            name_cache[hwnd] = (pid.value, name)
+            name_cache.move_to_end(hwnd)
+            if len(name_cache) > _FOREGROUND_CACHE_SIZE:
+                name_cache.popitem(last=False)
+            last[:] = hwnd, pid.value, name
+            return name
+        return _foreground_app_name
+    except Exception:
+        return None
+
+
+_windows_foreground_fn = _load_windows_foreground_fn()
+
+
+def _get_active_app_and_url_windows() -> Tuple[Optional[str], Optional[str]]:
+    """Get foreground window process name on Windows. Browser URL not implemented (would need UIA/accessibility)."""
+    if _windows_foreground_fn is None:
         return (None, None)
+    try:
+        name = _windows_foreground_fn()
     except Exception:
         return (None, None)
+    if not name:
+        return (None, None)
+    return (name, None)  # Browser URL would need UIA; no per-sample browser check until then
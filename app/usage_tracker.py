@@ -1,15 +1,69 @@
 """
 Usage tracker: when usage_policy_enabled, samples active app (and browser URL) and reports to POST /desktop/usage/report.
 """
-from typing import Dict, Tuple, Any, Optional
-from PySide6.QtCore import QObject, QTimer
+import os
+import sqlite3
+import sys
+from functools import partial
+from typing import Dict, List, Tuple, Any, Optional
+from PySide6.QtCore import Qt, QObject, Signal, QTimer, QRunnable, QThreadPool
 from .state_manager import StateManager, AppState
 from .api_client import APIClient
+from .config import USAGE_DB_FILE
 from .usage_helper import get_active_app_and_url
 
 
 SAMPLE_INTERVAL_MS = 10_000   # Sample every 10 seconds
-REPORT_INTERVAL_MS = 1 * 60 * 1000  # Report every 5 minutes
+REPORT_FLUSH_SECONDS = 300  # Report once this much usage was sampled since the last report...
+REPORT_FLUSH_KEYS = 16  # ...or as soon as this many distinct app/URL entries are pending
+REPORT_INTERVAL_MS = 5 * 60 * 1000  # Backstop: report at least every 5 minutes
+
+
+class _UsageSampleSignals(QObject):
+    """Signals for _UsageSampleWorker (QRunnable is not a QObject); delivered queued on the GUI thread."""
+
+    sampled = Signal(str, str)  # app_name ("" if unknown), site_url ("" if none)
+
+
+class _UsageSampleWorker(QRunnable):
+    """Reads the foreground app/URL (osascript / Win32, can take tens of ms) on a QThreadPool thread."""
+
+    def __init__(self):
+        super().__init__()
+        self.signals = _UsageSampleSignals()
+
+    def run(self):
+        try:
+            app_name, site_url = get_active_app_and_url()
+        except Exception as e:
+            print(f"Failed to sample active app: {e}")
+            app_name, site_url = None, None
+        self.signals.sampled.emit(app_name or "", site_url or "")
+
+
+class _UsageReportSignals(QObject):
+    """Signals for _UsageReportWorker; delivered queued on the GUI thread."""
+
+    reported = Signal()
+    failed = Signal(str)
+
+
+class _UsageReportWorker(QRunnable):
+    """Posts one batch to /desktop/usage/report on a QThreadPool thread."""
+
+    def __init__(self, api_client: APIClient, entries: List[Dict[str, Any]]):
+        super().__init__()
+        self.api_client = api_client
+        self.entries = entries
+        self.signals = _UsageReportSignals()
+
+    def run(self):
+        try:
+            self.api_client.report_usage(self.entries)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.reported.emit()
 
 
 class UsageTracker(QObject):
@@ -23,8 +77,114 @@ class UsageTracker(QObject):
         self._sample_timer.timeout.connect(self._sample)
         self._report_timer = QTimer()
         self._report_timer.timeout.connect(self._report)
-        self._accumulated: Dict[Tuple[str, Optional[str]], int] = {}  # (app_name, site_url or "") -> seconds
+        # Pending seconds as parallel lists (row i = _apps[i], _urls[i], _secs[i]); _idx maps (app, url or "") -> i
+        self._idx: Dict[Tuple[str, str], int] = {}
+        self._apps: List[str] = []
+        self._urls: List[str] = []
+        self._secs: List[int] = []
         self._is_active = False
+        # One sample at a time on our own pool (the Windows lookup reuses ctypes buffers); overlapping ticks are dropped
+        self._sample_pool = QThreadPool()
+        self._sample_pool.setMaxThreadCount(1)
+        self._inflight = 0
+        # Reports go out on their own single-thread pool: in order, and a slow server never blocks sampling or the UI
+        self._report_pool = QThreadPool()
+        self._report_pool.setMaxThreadCount(1)
+        self._generation = 0  # Bumped by start(); tells late report results which session they belong to
+        self._sampled_since_report = 0  # Seconds sampled since the last _report (re-queued failures don't count)
+        # Last sampled row: same foreground app/URL bumps it directly, with no key tuple or hashing
+        self._last_app: Optional[str] = None
+        self._last_url: Optional[str] = None
+        self._last_index = -1
+        # Unreported seconds are mirrored to SQLite so a crash or failed report doesn't lose them
+        self._owner: Optional[str] = None  # Login email; rows belong to this user (None = not persisted)
+        self._db: Optional[sqlite3.Connection] = None  # Opened lazily, GUI thread only
+
+    def _row(self, app_name: str, site_url: str) -> int:
+        """Index of the pending row for (app_name, site_url), appending an empty one if new."""
+        key = (app_name, site_url)
+        i = self._idx.get(key)
+        if i is None:
+            i = self._idx[key] = len(self._secs)
+            self._apps.append(app_name)
+            self._urls.append(site_url)
+            self._secs.append(0)
+        return i
+
+    def _clear_pending(self):
+        """Drop all pending rows."""
+        self._idx.clear()
+        self._apps.clear()
+        self._urls.clear()
+        self._secs.clear()
+        self._last_app = self._last_url = None
+        self._last_index = -1
+
+    def set_owner(self, owner: Optional[str]):
+        """Set the user whose unreported usage is persisted and restored on start()."""
+        self._owner = owner
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """Open (once) the usage database; None if unavailable."""
+        if self._db is None:
+            try:
+                os.makedirs(os.path.dirname(USAGE_DB_FILE), exist_ok=True)
+                db = sqlite3.connect(USAGE_DB_FILE)
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute("PRAGMA synchronous=NORMAL")  # WAL + NORMAL: durable across app crashes, cheap commits
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS usage (owner TEXT NOT NULL, app TEXT NOT NULL, url TEXT NOT NULL, "
+                    "seconds INTEGER NOT NULL, PRIMARY KEY (owner, app, url))"
+                )
+                db.commit()
+                self._db = db
+            except Exception as e:
+                print(f"Usage database unavailable: {e}")
+        return self._db
+
+    def _load_persisted(self):
+        """Seed the accumulator with usage left unreported by a previous session."""
+        db = self._connection() if self._owner else None
+        if db is None:
+            return
+        try:
+            for app_name, site_url, seconds in db.execute(
+                "SELECT app, url, seconds FROM usage WHERE owner = ? AND seconds > 0", (self._owner,)
+            ):
+                self._secs[self._row(sys.intern(app_name), sys.intern(site_url))] += seconds
+        except Exception as e:
+            print(f"Failed to load saved usage: {e}")
+
+    def _persist_sample(self, app_name: str, site_url: str, seconds: int):
+        """Add seconds to the saved row for (app_name, site_url)."""
+        db = self._connection() if self._owner else None
+        if db is None:
+            return
+        try:
+            with db:
+                db.execute(
+                    "INSERT INTO usage (owner, app, url, seconds) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (owner, app, url) DO UPDATE SET seconds = seconds + excluded.seconds",
+                    (self._owner, app_name, site_url, seconds),
+                )
+        except Exception as e:
+            print(f"Failed to save usage sample: {e}")
+
+    def _persist_reported(self, entries: List[Dict[str, Any]], owner: Optional[str]):
+        """Subtract reported seconds from owner's saved rows (samples taken meanwhile stay) and drop emptied rows."""
+        db = self._connection() if owner else None
+        if db is None:
+            return
+        try:
+            with db:
+                db.executemany(
+                    "UPDATE usage SET seconds = seconds - ? WHERE owner = ? AND app = ? AND url = ?",
+                    [(ent["duration_seconds"], owner, ent["app_name"], ent.get("site_url") or "")
+                     for ent in entries],
+                )
+                db.execute("DELETE FROM usage WHERE owner = ? AND seconds <= 0", (owner,))
+        except Exception as e:
+            print(f"Failed to update saved usage: {e}")
 
     def start(self):
         if self._is_active:
@@ -34,7 +194,10 @@ class UsageTracker(QObject):
         if self.state_manager.state != AppState.CHECKED_IN:
             return
         self._is_active = True
-        self._accumulated.clear()
+        self._generation += 1
+        self._sampled_since_report = 0
+        self._clear_pending()
+        self._load_persisted()
         self._sample_timer.start(SAMPLE_INTERVAL_MS)
         self._report_timer.start(REPORT_INTERVAL_MS)
 
@@ -45,7 +208,11 @@ class UsageTracker(QObject):
         self._sample_timer.stop()
         self._report_timer.stop()
         self._report()  # Flush remaining
-        self._accumulated.clear()
+        self._clear_pending()
+
+    def wait_for_reports(self, msecs: int) -> bool:
+        """Block until queued usage reports are sent (or msecs pass); call off the GUI thread."""
+        return self._report_pool.waitForDone(msecs)
 
     def _sample(self):
         if self.state_manager.state != AppState.CHECKED_IN:
@@ -54,31 +221,68 @@ class UsageTracker(QObject):
         if not self.state_manager.usage_policy_enabled:
             self.stop()
             return
-        app_name, site_url = get_active_app_and_url()
-        if not app_name:
+        if self._inflight > 0:
+            return
+        worker = _UsageSampleWorker()
+        worker.signals.sampled.connect(self._on_sample, Qt.QueuedConnection)
+        self._inflight += 1
+        self._sample_pool.start(worker)
+
+    def _on_sample(self, app_name: str, site_url: str):
+        """Count one sample interval for the app/URL the worker saw (GUI thread)."""
+        self._inflight -= 1
+        if not self._is_active or not app_name:
             return
-        key = (app_name, site_url or "")
-        self._accumulated[key] = self._accumulated.get(key, 0) + (SAMPLE_INTERVAL_MS // 1000)
+        rows = len(self._secs)
+        if app_name == self._last_app and site_url == self._last_url:
+            i = self._last_index
+        else:
+            i = self._row(sys.intern(app_name), sys.intern(site_url))
+            self._last_app, self._last_url, self._last_index = self._apps[i], self._urls[i], i
+        new_row = len(self._secs) > rows
+        seconds = SAMPLE_INTERVAL_MS // 1000
+        self._secs[i] += seconds
+        self._persist_sample(self._apps[i], self._urls[i], seconds)
+        self._sampled_since_report += seconds
+        if self._sampled_since_report >= REPORT_FLUSH_SECONDS or (new_row and len(self._secs) >= REPORT_FLUSH_KEYS):
+            self._report()
 
     def _report(self):
-        if not self._accumulated:
+        self._sampled_since_report = 0
+        if self._is_active:
+            self._report_timer.start(REPORT_INTERVAL_MS)  # Backstop counts from the latest flush
+        if not self._secs:
             return
-        entries = []
-        for (app_name, site_url), duration_seconds in self._accumulated.items():
-            if duration_seconds <= 0:
-                continue
-            entry = {"app_name": app_name, "duration_seconds": duration_seconds}
-            if site_url:
-                entry["site_url"] = site_url
-            entries.append(entry)
-        self._accumulated.clear()
+        # Zero rows only come from _on_report_done trimming a restored batch
+        entries = [
+            {"app_name": app_name, "duration_seconds": seconds, "site_url": site_url} if site_url
+            else {"app_name": app_name, "duration_seconds": seconds}
+            for app_name, site_url, seconds in zip(self._apps, self._urls, self._secs) if seconds > 0
+        ]
+        self._clear_pending()
         if not entries:
             return
-        try:
-            self.api_client.report_usage(entries)
-        except Exception as e:
-            print(f"Failed to report usage: {e}")
-            # Re-accumulate so we don't lose data (optional: could drop)
+        worker = _UsageReportWorker(self.api_client, entries)
+        worker.signals.reported.connect(
+            partial(self._on_report_done, entries, self._owner, self._generation), Qt.QueuedConnection)
+        worker.signals.failed.connect(
+            partial(self._on_report_failed, entries, self._generation), Qt.QueuedConnection)
+        self._report_pool.start(worker)
+
+    def _on_report_done(self, entries: List[Dict[str, Any]], owner: Optional[str], generation: int):
+        """Batch accepted: drop it from the saved rows (GUI thread)."""
+        self._persist_reported(entries, owner)
+        if generation != self._generation and owner == self._owner:
+            # A newer session was seeded from the saved rows while this batch was in flight: don't send it twice
             for ent in entries:
-                key = (ent["app_name"], ent.get("site_url") or "")
-                self._accumulated[key] = self._accumulated.get(key, 0) + ent["duration_seconds"]
+                i = self._idx.get((ent["app_name"], ent.get("site_url") or ""))
+                if i is not None:
+                    self._secs[i] = max(0, self._secs[i] - ent["duration_seconds"])
+
+    def _on_report_failed(self, entries: List[Dict[str, Any]], generation: int, message: str):
+        """Re-accumulate a rejected batch so the next report retries it (GUI thread)."""
+        print(f"Failed to report usage: {message}")
+        if not self._is_active or generation != self._generation:
+            return  # Still saved on disk; the next start() restores it
+        for ent in entries:
+            self._secs[self._row(ent["app_name"], ent.get("site_url") or "")] += ent["duration_seconds"]